@@ -11,9 +11,10 @@ import sys
 # 添加父目录到路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from core.downloader import DownloadManager, DownloadWorker
+from core.downloader import DownloadManager, DownloadWorker, ResolveWorker
 
 __all__ = [
     'DownloadManager',
-    'DownloadWorker'
+    'DownloadWorker',
+    'ResolveWorker'
 ]
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+全局限速
+所有下载（视频、分段、图集）共用一个令牌桶，总速度不超过 download.rate_limit；
+每个任务持有一个带权重的份额，等待令牌的请求按加权公平排队（自计时公平排队 SCFQ）：
+高优先级任务按权重多分带宽，刚开始的小任务不必排在大批量任务积压的请求之后
+"""
+
+import os
+import sys
+import time
+import heapq
+import itertools
+import threading
+from typing import Optional, List, Tuple
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.config import get_setting
+
+# 令牌桶容量（秒）：空闲后最多允许这么多秒的突发流量
+BURST_TIME = 0.2
+MIN_BURST = 64 * 1024
+
+# 限速时单次读取的数据量（秒），读取量越小，各任务之间交替越细
+READ_SLICE_TIME = 0.05
+MIN_READ_LIMIT = 16 * 1024
+
+
+class BandwidthShare:
+    """一个任务的带宽份额（同一任务的多个连接共用）"""
+
+    def __init__(self, limiter: "BandwidthLimiter", weight: float = 1.0):
+        """
+        :param limiter: 所属限速器
+        :param weight: 权重，同时下载的任务按权重比例分配带宽
+        """
+        self.limiter = limiter
+        self.weight = max(0.01, float(weight))
+        # 该任务最后一个请求的虚拟完成时间（由限速器在锁内更新）
+        self.finish_tag = 0.0
+
+    def consume(self, n: int):
+        """已接收 n 字节：令牌不足时阻塞"""
+        self.limiter.acquire(self, n)
+
+    def read_limit(self) -> Optional[int]:
+        """建议的单次读取上限，不限速时为 None"""
+        return self.limiter.read_limit()
+
+
+class BandwidthLimiter:
+    """
+    加权公平的令牌桶限速器（线程安全）
+    每个请求的虚拟完成时间 = max(任务上次的完成时间, 当前虚拟时间) + 字节数 / 权重，
+    令牌按完成时间从小到大发放；限速可随时调整，正在等待的请求立即按新速度计算
+    """
+
+    def __init__(self, rate: int = 0):
+        """
+        :param rate: 总速度上限（字节/秒），0 表示不限速
+        """
+        self._cond = threading.Condition()
+        self._rate = 0
+        self._burst = MIN_BURST
+        self._tokens = 0.0
+        self._last_refill = time.monotonic()
+        self._virtual_time = 0.0
+        self._waiters: List[Tuple[float, int, int]] = []  # (虚拟完成时间, 序号, 字节数)
+        self._seq = itertools.count()
+        self.set_rate(rate)
+
+    @property
+    def rate(self) -> int:
+        return self._rate
+
+    def set_rate(self, rate: int):
+        """
+        调整总速度上限（立即生效）
+        :param rate: 字节/秒，0 表示不限速
+        """
+        with self._cond:
+            self._refill()
+            self._rate = max(0, int(rate))
+            self._burst = max(MIN_BURST, self._rate * BURST_TIME)
+            self._tokens = min(self._tokens, self._burst)
+            self._cond.notify_all()
+
+    def share(self, weight: float = 1.0) -> BandwidthShare:
+        """为一个任务创建带宽份额"""
+        return BandwidthShare(self, weight)
+
+    def read_limit(self) -> Optional[int]:
+        """限速时的单次读取上限"""
+        rate = self._rate
+        if rate <= 0:
+            return None
+        return max(MIN_READ_LIMIT, int(rate * READ_SLICE_TIME))
+
+    def _refill(self):
+        """按经过的时间补充令牌（调用方持有锁）"""
+        now = time.monotonic()
+        if self._rate > 0:
+            self._tokens = min(self._burst, self._tokens + (now - self._last_refill) * self._rate)
+        self._last_refill = now
+
+    def acquire(self, share: BandwidthShare, n: int):
+        """
+        为 share 取得 n 字节的令牌，不足时按公平顺序等待
+        单次请求超过桶容量时允许令牌变为负数，由后续请求偿还
+        """
+        if n <= 0 or self._rate <= 0:
+            return
+
+        with self._cond:
+            if self._rate <= 0:
+                return
+            tag = max(share.finish_tag, self._virtual_time) + n / share.weight
+            share.finish_tag = tag
+            entry = (tag, next(self._seq), n)
+            heapq.heappush(self._waiters, entry)
+            try:
+                while self._rate > 0:
+                    self._refill()
+                    if self._waiters[0] is entry:
+                        need = min(n, self._burst)
+                        if self._tokens >= need:
+                            self._tokens -= n
+                            self._virtual_time = tag
+                            break
+                        timeout = (need - self._tokens) / self._rate
+                    else:
+                        # 排在前面的请求发放后会唤醒
+                        timeout = None
+                    self._cond.wait(timeout)
+            finally:
+                if self._waiters[0] is entry:
+                    heapq.heappop(self._waiters)
+                else:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+
+_bandwidth_limiter: Optional[BandwidthLimiter] = None
+_bandwidth_limiter_lock = threading.Lock()
+
+
+def get_bandwidth_limiter() -> BandwidthLimiter:
+    """获取进程内共享的限速器"""
+    global _bandwidth_limiter
+    if _bandwidth_limiter is None:
+        with _bandwidth_limiter_lock:
+            if _bandwidth_limiter is None:
+                _bandwidth_limiter = BandwidthLimiter(int(get_setting("download", "rate_limit", 0)))
+    return _bandwidth_limiter
+
+
+# 测试代码：python core/bandwidth.py
+#   总限速 4 MB/s 下 6 个大任务持续下载，中途加入一个 1 MB 的小任务，
+#   对比小任务权重为 1 和 8 时的完成耗时，以及中途调整限速后的实际速度
+if __name__ == "__main__":
+    RATE = 4 * 1024 * 1024
+    CHUNK = 64 * 1024
+    SMALL_JOB = 1024 * 1024
+
+    def run(small_weight: float, change_rate_to: Optional[int] = None):
+        limiter = BandwidthLimiter(RATE)
+        stop = threading.Event()
+        received = [0]
+        lock = threading.Lock()
+
+        def bulk():
+            share = limiter.share(1)
+            while not stop.is_set():
+                share.consume(CHUNK)
+                with lock:
+                    received[0] += CHUNK
+
+        threads = [threading.Thread(target=bulk, daemon=True) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        time.sleep(1)
+
+        share = limiter.share(small_weight)
+        began = time.perf_counter()
+        for _ in range(SMALL_JOB // CHUNK):
+            share.consume(CHUNK)
+        small_time = time.perf_counter() - began
+
+        if change_rate_to is not None:
+            limiter.set_rate(change_rate_to)
+        time.sleep(0.5)
+        with lock:
+            start_bytes = received[0]
+        began = time.perf_counter()
+        time.sleep(2)
+        with lock:
+            rate = (received[0] - start_bytes) / (time.perf_counter() - began)
+        stop.set()
+        limiter.set_rate(0)
+        for thread in threads:
+            thread.join()
+        return small_time, rate
+
+    print(f"总限速 {RATE / 1024 / 1024:.0f} MB/s，6 个批量任务 + 1 个 {SMALL_JOB // 1024} KB 单条任务")
+    for weight in (1, 8):
+        small_time, rate = run(weight)
+        print(f"单条任务权重 {weight}: 耗时 {small_time:.2f}s（独占带宽需 {SMALL_JOB / RATE:.2f}s），"
+              f"批量任务总速度 {rate / 1024 / 1024:.2f} MB/s")
+    _, rate = run(8, change_rate_to=1024 * 1024)
+    print(f"运行中改为 1 MB/s: 实际 {rate / 1024 / 1024:.2f} MB/s")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+配置读取 - 加载项目根目录下的 config.json
+"""
+
+import os
+import json
+import copy
+from typing import Any, Dict
+
+# 配置文件路径（项目根目录）
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config.json')
+
+# 默认配置，config.json 中缺失的键使用这里的值
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "download": {
+        "default_dir": "douyin_downloads",
+        "max_concurrent_downloads": 3,
+        "max_concurrent_resolves": 4,
+        "segments": 1,
+        "min_segment_size": 1048576,
+        "image_concurrency": 4,
+        "max_concurrent_postprocess": 2,
+        "faststart": False,
+        "preallocate": True,
+        "write_buffer_size": 1048576,
+        "fsync_policy": "none",
+        "rate_limit": 0,
+        "high_priority_weight": 8,
+    },
+    "douyin": {
+        "timeout": 30,
+        "max_retries": 3,
+        "retry_delay": 1,
+        "circuit_failure_threshold": 5,
+        "circuit_reset_timeout": 30,
+        "info_cache_ttl": 300,
+    },
+    "ui": {
+        "progress_refresh_hz": 15,
+    },
+    "network": {
+        "pool_connections": 16,
+        "pool_maxsize": 16,
+        "pool_block": True,
+    },
+    "cache": {
+        "dir": "~/.douyingo",
+        "short_link_ttl": 604800,
+        "short_link_max_entries": 5000,
+        "thumbnail_memory_entries": 500,
+        "thumbnail_disk_max_bytes": 64 * 1024 * 1024,
+        "thumbnail_decode_threads": 2,
+        "cover_max_entries": 2000,
+    },
+}
+
+_config_cache: Dict[str, Any] = {}
+
+
+def _merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """递归合并配置字典"""
+    result = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = _merge(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+def load_config(reload: bool = False) -> Dict[str, Any]:
+    """
+    加载配置（进程内只读取一次）
+    :param reload: 是否强制重新读取
+    :return: 配置字典
+    """
+    if _config_cache and not reload:
+        return _config_cache
+
+    # 缓存中的分组会被原地修改，不能与 DEFAULT_CONFIG 共用同一个字典
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    try:
+        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+            config = _merge(DEFAULT_CONFIG, json.load(f))
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"⚠️ 读取配置文件失败，使用默认配置: {e}")
+
+    _config_cache.clear()
+    _config_cache.update(config)
+    return _config_cache
+
+
+def get_setting(section: str, key: str, default: Any = None) -> Any:
+    """
+    获取单个配置项
+    :param section: 配置分组，如 "download"
+    :param key: 配置键
+    :param default: 缺省值
+    """
+    return load_config().get(section, {}).get(key, default)
+
+
+def get_cache_dir(*parts: str) -> str:
+    """
+    获取缓存目录（不存在时自动创建）
+    :param parts: 子目录
+    """
+    path = os.path.join(os.path.expanduser(get_setting("cache", "dir", "~/.douyingo")), *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+作品封面
+分享页内嵌了封面图地址，解析完成后即可下载作为缩略图，不必等视频下载完成再用 ffmpeg 解码；
+封面按 aweme_id 缓存在本地，重复添加同一作品不再请求网络；
+封面数量超过 cache.cover_max_entries 时删除最早下载的封面（已复制到视频旁边的缩略图不受影响）
+"""
+
+import os
+import sys
+import threading
+from typing import Optional, List
+
+import requests
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.config import get_setting, get_cache_dir
+from core.http_client import get_session
+from core.retry import get_timeout
+
+# 封面图大小上限（超过时视为异常响应，改用下一个地址）
+MAX_COVER_SIZE = 2 * 1024 * 1024
+
+# 界面无法解码的格式
+UNSUPPORTED_COVER_FORMATS = (".heic", ".heif")
+
+# 清理后保留的比例
+EVICT_TARGET_RATIO = 0.8
+
+# 缓存目录中的封面数量（首次写入时统计）
+_cover_count: Optional[int] = None
+_cover_count_lock = threading.Lock()
+
+
+def get_cover_path(aweme_id: str) -> str:
+    """封面缓存路径"""
+    return os.path.join(get_cache_dir("covers"), f"{aweme_id}.jpg")
+
+
+def get_cached_cover(aweme_id: Optional[str]) -> Optional[str]:
+    """查询已缓存的封面（不访问网络）"""
+    if not aweme_id:
+        return None
+    path = get_cover_path(aweme_id)
+    return path if os.path.isfile(path) and os.path.getsize(path) > 0 else None
+
+
+def _evict_covers(cover_dir: str, max_entries: int):
+    """封面数量超过上限时，删除最早下载的封面，直到数量降到上限的 80%"""
+    global _cover_count
+    with _cover_count_lock:
+        if _cover_count is None:
+            _cover_count = sum(1 for name in os.listdir(cover_dir) if name.endswith(".jpg"))
+        else:
+            _cover_count += 1
+        if _cover_count <= max_entries:
+            return
+
+        files = []
+        with os.scandir(cover_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".jpg"):
+                    try:
+                        files.append((entry.stat().st_mtime, entry.path))
+                    except OSError:
+                        pass
+        files.sort()
+        remove_count = len(files) - int(max_entries * EVICT_TARGET_RATIO)
+        for _, path in files[:max(0, remove_count)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        _cover_count = sum(1 for name in os.listdir(cover_dir) if name.endswith(".jpg"))
+
+
+def fetch_cover(aweme_id: Optional[str], cover_urls: List[str],
+                session: Optional[requests.Session] = None) -> Optional[str]:
+    """
+    下载作品封面（已缓存时直接返回）
+    :param aweme_id: 作品ID，作为缓存文件名
+    :param cover_urls: 封面地址，按优先级排列（同一封面的多个 CDN 地址）
+    :param session: HTTP 会话，默认使用共享会话
+    :return: 封面文件路径，全部地址失败时返回 None
+    """
+    cached = get_cached_cover(aweme_id)
+    if cached or not aweme_id or not cover_urls:
+        return cached
+
+    session = session or get_session()
+    path = get_cover_path(aweme_id)
+    for url in cover_urls:
+        if any(ext in url.lower() for ext in UNSUPPORTED_COVER_FORMATS):
+            continue
+        try:
+            with session.get(url, timeout=get_timeout(), stream=True) as response:
+                response.raise_for_status()
+                if not response.headers.get("Content-Type", "image/").startswith("image/"):
+                    continue
+                content = response.raw.read(MAX_COVER_SIZE + 1, decode_content=True)
+            if not content or len(content) > MAX_COVER_SIZE:
+                continue
+
+            # 先写临时文件再替换，界面不会读到写了一半的图片
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            _evict_covers(os.path.dirname(path), max(1, int(get_setting("cache", "cover_max_entries", 2000))))
+            return path
+
+        except (requests.RequestException, OSError) as e:
+            print(f"⚠️ 下载封面失败: {e}")
+
+    return None
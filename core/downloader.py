@@ -7,13 +7,67 @@
 
 import os
 import sys
-from typing import Optional, Callable, Dict, Any
-from PyQt5.QtCore import QObject, pyqtSignal, QThread
+import heapq
+import shutil
+import itertools
+from collections import deque
+from typing import Optional, Callable, Dict, Any, List, Tuple, Deque
+from PyQt5.QtCore import QObject, pyqtSignal, QThread, QTimer
 
 # 添加父目录到路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from core.pure_python_extractor import PurePythonExtractor
+from core.pure_python_extractor import PurePythonExtractor, DouyinVideoInfo
+from core.config import get_setting
+from core.history import get_history, file_sha256
+from core.link_cache import lookup_aweme_id
+from core.progress import ProgressTable
+from core.task_store import TaskStore
+from core.cover import fetch_cover, get_cached_cover
+from core.bandwidth import get_bandwidth_limiter
+from core.thumbnail_extractor import probe_media, get_thumbnail_path, format_duration, format_resolution
+
+# 任务优先级（数值越小越先执行）
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+
+
+def priority_weight(priority: int) -> float:
+    """任务优先级对应的带宽权重：高优先级任务按 download.high_priority_weight 倍分配带宽"""
+    if priority <= PRIORITY_HIGH:
+        return max(1.0, float(get_setting("download", "high_priority_weight", 8)))
+    return 1.0
+
+
+class ResolveWorker(QThread):
+    """链接解析工作线程：解析完成后顺带下载封面（体积小，作为缩略图）"""
+
+    # 信号
+    resolved = pyqtSignal(str, object)  # video_id, DouyinVideoInfo（失败为 None）
+    cover_ready = pyqtSignal(str, str)  # video_id, 封面路径
+
+    def __init__(self, video_id: str, url: str):
+        super().__init__()
+        self.video_id = video_id
+        self.url = url
+        self.extractor = PurePythonExtractor()
+
+    def run(self):
+        """执行解析"""
+        video_info = None
+        try:
+            print(f"🔍 正在获取视频信息: {self.url}")
+            video_info = self.extractor.get_video_info(self.url)
+        except Exception as e:
+            print(f"❌ 获取视频信息失败: {e}")
+
+        self.resolved.emit(self.video_id, video_info)
+
+        # 先发出解析结果，下载可以立即开始，封面在此线程继续下载
+        if video_info and video_info.cover_urls:
+            cover = fetch_cover(video_info.aweme_id, video_info.cover_urls, self.extractor.session)
+            if cover:
+                self.cover_ready.emit(self.video_id, cover)
 
 
 class DownloadWorker(QThread):
@@ -25,12 +79,29 @@ class DownloadWorker(QThread):
     download_completed = pyqtSignal(str, dict)  # video_id, result
     error_occurred = pyqtSignal(str, str)  # video_id, error_message
 
-    def __init__(self, video_id: str, url: str, download_dir: str):
+    def __init__(self, video_id: str, url: str, download_dir: str,
+                 video_info: Optional[DouyinVideoInfo] = None,
+                 progress_table: Optional[ProgressTable] = None,
+                 priority: int = PRIORITY_NORMAL):
+        """
+        :param progress_table: 进度表，提供时进度写入进度表而不发送 progress_updated 信号
+        :param priority: 任务优先级，决定全局限速下分到的带宽
+        """
         super().__init__()
         self.video_id = video_id
         self.url = url
         self.download_dir = download_dir
+        self.video_info = video_info
+        self.progress_table = progress_table
         self.extractor = PurePythonExtractor()
+        self.bandwidth = get_bandwidth_limiter().share(priority_weight(priority))
+
+    def _report_progress(self, progress: int, message: str):
+        """报告进度"""
+        if self.progress_table is not None:
+            self.progress_table.update(self.video_id, progress, message)
+        else:
+            self.progress_updated.emit(self.video_id, progress, message)
 
     def run(self):
         """执行下载"""
@@ -39,18 +110,23 @@ class DownloadWorker(QThread):
             self.status_changed.emit(self.video_id, "downloading")
 
             # 发送进度
-            self.progress_updated.emit(self.video_id, 10, "正在解析视频...")
+            self._report_progress(10, "正在解析视频...")
 
-            # 定义进度回调函数
-            def progress_callback(progress, message):
-                self.progress_updated.emit(self.video_id, progress, message)
+            transfer_callback = None
+            if self.progress_table is not None:
+                def transfer_callback(downloaded, total):
+                    self.progress_table.update_bytes(self.video_id, downloaded, total)
 
             # 开始下载，传递进度回调
-            result = self.extractor.download_video(self.url, self.download_dir, progress_callback)
+            result = self.extractor.download_video(self.url, self.download_dir, self._report_progress,
+                                                   video_info=self.video_info,
+                                                   transfer_callback=transfer_callback,
+                                                   bandwidth=self.bandwidth)
 
             if result.get("success"):
-                # 下载成功
-                self.progress_updated.emit(self.video_id, 100, "下载完成")
+                # 下载成功，写入下载历史
+                self._record_history(result)
+                self._report_progress(100, "下载完成")
                 self.status_changed.emit(self.video_id, "success")
                 self.download_completed.emit(self.video_id, result)
             else:
@@ -64,31 +140,158 @@ class DownloadWorker(QThread):
             self.status_changed.emit(self.video_id, "error")
             self.error_occurred.emit(self.video_id, str(e))
 
+    def _record_history(self, result: Dict[str, Any]):
+        """把下载结果写入历史索引（文件哈希由后处理线程补充，不占用下载槽位）"""
+        video_info = result.get("video_info") or {}
+        files = result.get("downloaded_files", [])
+        try:
+            get_history().record(video_info.get("aweme_id"), self.url, video_info.get("desc") or "",
+                                 video_info.get("type"), files)
+        except Exception as e:
+            print(f"⚠️ 写入下载历史失败: {e}")
+
+
+class PostProcessWorker(QThread):
+    """
+    下载完成后的后处理线程：计算文件哈希，提取缩略图，读取文件大小、时长和分辨率
+    由下载管理器的后处理队列限制并发，读取整个文件和 ffmpeg 解码都不占用下载槽位
+    """
+
+    # 信号
+    processed = pyqtSignal(str, dict)  # video_id, 媒体信息
+
+    def __init__(self, video_id: str, downloaded_files: List[Dict[str, Any]], aweme_id: Optional[str] = None,
+                 cover: Optional[str] = None):
+        """
+        :param aweme_id: 作品ID，提供时把文件哈希和缩略图写回下载历史
+        :param cover: 已下载的封面，有封面时不再用 ffmpeg 解码视频帧
+        """
+        super().__init__()
+        self.video_id = video_id
+        self.downloaded_files = downloaded_files
+        self.aweme_id = aweme_id
+        self.cover = cover
+
+    def run(self):
+        """执行后处理"""
+        media_info: Dict[str, Any] = {"size": 0, "duration": None, "resolution": None, "thumbnail": None}
+        history_changed = False
+        try:
+            for file_info in self.downloaded_files:
+                path = file_info.get("path")
+                if file_info.get("type") not in ("video", "image") or not path or not os.path.exists(path):
+                    continue
+                media_info["size"] += os.path.getsize(path)
+
+                if file_info.get("type") == "video" and media_info["duration"] is None:
+                    thumbnail = file_info.get("thumbnail")
+                    cover = self.cover or get_cached_cover(self.aweme_id)
+                    if not (thumbnail and os.path.exists(thumbnail)) and cover and os.path.exists(cover):
+                        # 封面复制到视频旁边，缩略图随视频保存
+                        thumbnail = get_thumbnail_path(path)
+                        shutil.copyfile(cover, thumbnail)
+                        file_info["thumbnail"] = thumbnail
+                        history_changed = True
+
+                    if thumbnail and os.path.exists(thumbnail):
+                        media = probe_media(path)
+                    else:
+                        # 同一次 ffmpeg 调用提取缩略图和媒体信息
+                        media = probe_media(path, get_thumbnail_path(path))
+                        thumbnail = media.thumbnail
+                        if thumbnail:
+                            file_info["thumbnail"] = thumbnail
+                            history_changed = True
+                    media_info["thumbnail"] = thumbnail
+                    media_info["duration"] = format_duration(media.duration) if media.duration > 0 else None
+                    media_info["resolution"] = (format_resolution(media.width, media.height)
+                                                if media.width > 0 else None)
+        except Exception as e:
+            print(f"⚠️ 读取媒体信息失败: {e}")
+
+        # 先更新卡片，再读取整个文件计算哈希
+        self.processed.emit(self.video_id, media_info)
+
+        try:
+            for file_info in self.downloaded_files:
+                path = file_info.get("path")
+                if (file_info.get("type") in ("video", "image") and not file_info.get("sha256")
+                        and path and os.path.exists(path)):
+                    file_info["sha256"] = file_sha256(path)
+                    history_changed = True
+
+            if history_changed and self.aweme_id:
+                get_history().update_files(self.aweme_id, self.downloaded_files)
+        except Exception as e:
+            print(f"⚠️ 更新下载历史失败: {e}")
+
 
 class DownloadManager(QObject):
     """下载管理器"""
 
     # 信号
     video_added = pyqtSignal(dict)  # 添加视频
-    progress_updated = pyqtSignal(str, int, str)  # 进度更新
+    video_info_updated = pyqtSignal(str, dict)  # 解析完成，更新视频信息
+    progress_batch = pyqtSignal(dict)  # 进度批量更新 {video_id: 进度信息}
     status_changed = pyqtSignal(str, str)  # 状态改变
     download_completed = pyqtSignal(str, dict)  # 下载完成
     error_occurred = pyqtSignal(str, str)  # 错误发生
+    download_skipped = pyqtSignal(str, dict)  # 已下载过，跳过（video_id, 历史记录）
+    stats_changed = pyqtSignal(dict)  # 任务统计变化（TaskStore.stats()）
+    media_info_ready = pyqtSignal(str, dict)  # 后处理完成（video_id, {"size", "duration", "resolution", "thumbnail"}）
+    cover_ready = pyqtSignal(str, str)  # 封面已下载（video_id, 封面路径）
 
-    def __init__(self, download_dir: str = "douyin_downloads"):
+    def __init__(self, download_dir: Optional[str] = None, max_workers: Optional[int] = None):
         super().__init__()
-        self.download_dir = download_dir
+        self.download_dir = download_dir or get_setting("download", "default_dir", "douyin_downloads")
+        self.max_workers = max(1, int(max_workers or get_setting("download", "max_concurrent_downloads", 3)))
         self.workers: Dict[str, DownloadWorker] = {}
-        self.extractor = PurePythonExtractor()
+
+        # 解析队列：链接解析在后台线程进行，不阻塞界面
+        self.max_resolvers = max(1, int(get_setting("download", "max_concurrent_resolves", 4)))
+        self.resolvers: Dict[str, ResolveWorker] = {}
+        # (优先级, 入队序号, video_id)，单条粘贴的链接不必排在批量链接之后
+        self.resolve_queue: List[Tuple[int, int, str]] = []
+        self._resolving: Dict[str, Tuple[str, int]] = {}  # video_id -> (url, priority)
+
+        # 等待队列：(优先级, 入队序号, video_id, url)，同优先级按先进先出
+        self.pending_queue: List[Tuple[int, int, str, str]] = []
+        self._queue_seq = itertools.count()
+        self._queued_ids = set()
+
+        # 已解析的视频信息，交给下载线程复用，避免重复请求页面
+        self.video_infos: Dict[str, DouyinVideoInfo] = {}
+
+        # 已下载的封面，交给后处理线程代替 ffmpeg 解码
+        self.covers: Dict[str, str] = {}
+
+        # 下载线程把进度写入进度表，由定时器按固定频率批量发给界面
+        self.progress_table = ProgressTable()
+        refresh_hz = max(1, int(get_setting("ui", "progress_refresh_hz", 15)))
+        self.progress_timer = QTimer(self)
+        self.progress_timer.setInterval(1000 // refresh_hz)
+        self.progress_timer.timeout.connect(self.flush_progress)
+
+        # 任务状态和统计
+        self.task_store = TaskStore()
+
+        # 后处理队列：下载完成后在后台提取缩略图、读取时长和分辨率
+        # 并发数与下载并发数分别配置，解码再慢也不会占住下载槽位
+        self.max_postprocessors = max(1, int(get_setting("download", "max_concurrent_postprocess", 2)))
+        self.postprocessors: Dict[str, PostProcessWorker] = {}
+        self.postprocess_queue: Deque[Tuple[str, List[Dict[str, Any]], Optional[str], Optional[str]]] = deque()
 
         # 确保下载目录存在
-        os.makedirs(download_dir, exist_ok=True)
+        os.makedirs(self.download_dir, exist_ok=True)
 
-    def add_download(self, url: str, video_id: Optional[str] = None) -> Dict[str, Any]:
+    def add_download(self, url: str, video_id: Optional[str] = None,
+                     priority: int = PRIORITY_NORMAL) -> Dict[str, Any]:
         """
         添加下载任务
+        卡片立即以"解析中"状态出现，链接解析在后台线程完成后再开始下载
         :param url: 视频URL
         :param video_id: 视频ID（可选，自动生成）
+        :param priority: 下载优先级
         :return: 视频信息
         """
         # 生成视频ID
@@ -96,56 +299,39 @@ class DownloadManager(QObject):
             import hashlib
             video_id = hashlib.md5(url.encode()).hexdigest()[:16]
 
-        # 先获取视频信息
-        try:
-            print(f"🔍 正在获取视频信息: {url}")
-            video_info_obj = self.extractor.get_video_info(url)
-
-            if not video_info_obj:
-                # 如果获取信息失败，使用默认信息
-                video_data = {
-                    "id": video_id,
-                    "url": url,
-                    "title": "抖音视频",
-                    "format": "MP4",
-                    "size": "未知",
-                    "resolution": "未知",
-                    "duration": "未知",
-                    "status": "pending",
-                    "progress": 0,
-                    "thumbnail": None
-                }
-            else:
-                # 使用获取到的信息
-                video_info = video_info_obj.to_dict()
-                video_data = {
-                    "id": video_id,
-                    "url": url,
-                    "title": video_info.get("desc", "抖音视频")[:50],
-                    "format": "MP4" if video_info.get("type") == "video" else "图片集",
-                    "size": "未知",
-                    "resolution": "1080p" if video_info.get("type") == "video" else "未知",
-                    "duration": "未知",
-                    "status": "pending",
-                    "progress": 0,
-                    "thumbnail": None
-                }
-
-            # 发送信号
+        # 已下载过且文件仍在：直接标记完成，不发起任何网络请求
+        record = self._find_downloaded(url)
+        if record:
+            video_data = self._build_history_video_data(video_id, url, record)
+            self.task_store.add(video_id, "success")
             self.video_added.emit(video_data)
+            self.download_skipped.emit(video_id, record)
+            self._emit_stats()
+            self._enqueue_postprocess(video_id, record["files"], record.get("aweme_id"))
+            return video_data
 
-            # 立即开始下载
-            self.start_download(video_id, url)
+        video_data = self._build_video_data(video_id, url, None, "resolving")
+        video_data["title"] = "正在解析..."
 
-            return video_data
+        # 发送信号
+        self.task_store.add(video_id, "resolving")
+        self.video_added.emit(video_data)
+        self._emit_stats()
 
-        except Exception as e:
-            print(f"❌ 添加下载任务失败: {e}")
-            import traceback
-            traceback.print_exc()
+        # 加入解析队列
+        if video_id not in self._resolving:
+            self._resolving[video_id] = (url, priority)
+            heapq.heappush(self.resolve_queue, (priority, next(self._queue_seq), video_id))
+            self._schedule_resolves()
 
-            # 返回基本信息
-            video_data = {
+        return video_data
+
+    def _build_video_data(self, video_id: str, url: str, video_info_obj: Optional[DouyinVideoInfo],
+                          status: str) -> Dict[str, Any]:
+        """根据解析结果生成卡片数据"""
+        if not video_info_obj:
+            # 如果获取信息失败，使用默认信息
+            return {
                 "id": video_id,
                 "url": url,
                 "title": "抖音视频",
@@ -153,28 +339,167 @@ class DownloadManager(QObject):
                 "size": "未知",
                 "resolution": "未知",
                 "duration": "未知",
-                "status": "error",
+                "status": status,
                 "progress": 0,
                 "thumbnail": None
             }
-            self.video_added.emit(video_data)
-            self.error_occurred.emit(video_id, str(e))
-            return video_data
 
-    def start_download(self, video_id: str, url: str):
+        video_info = video_info_obj.to_dict()
+        return {
+            "id": video_id,
+            "aweme_id": video_info.get("aweme_id"),
+            "url": url,
+            "title": (video_info.get("desc") or "抖音视频")[:50],
+            "format": "MP4" if video_info.get("type") == "video" else "图片集",
+            "size": "未知",
+            "resolution": "未知",  # 下载完成后由后处理读取
+            "duration": "未知",
+            "status": status,
+            "progress": 0,
+            "thumbnail": None
+        }
+
+    def _find_downloaded(self, url: str) -> Optional[Dict[str, Any]]:
+        """查询下载历史（只查本地索引和缓存，不访问网络）"""
+        try:
+            history = get_history()
+            return history.find_by_url(url) or history.find_by_aweme_id(lookup_aweme_id(url))
+        except Exception as e:
+            print(f"⚠️ 查询下载历史失败: {e}")
+            return None
+
+    def _build_history_video_data(self, video_id: str, url: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """根据历史记录生成卡片数据"""
+        thumbnail = next((f.get("thumbnail") for f in record["files"] if f.get("thumbnail")), None)
+        thumbnail = thumbnail or get_cached_cover(record.get("aweme_id"))
+        return {
+            "id": video_id,
+            "aweme_id": record.get("aweme_id"),
+            "url": url,
+            "title": (record.get("title") or "抖音视频")[:50],
+            "format": "MP4" if record.get("type") == "video" else "图片集",
+            "size": self._format_size(record.get("total_size") or 0),
+            "resolution": "未知",
+            "duration": "未知",
+            "status": "success",
+            "progress": 100,
+            "thumbnail": thumbnail
+        }
+
+    @staticmethod
+    def _slot_limit(limit: int, priority: int) -> int:
+        """高优先级任务可以多占一个槽位，不必等批量任务让出槽位"""
+        return limit + 1 if priority <= PRIORITY_HIGH else limit
+
+    def _schedule_resolves(self):
+        """启动解析线程，填满空闲的解析槽位"""
+        while (self.resolve_queue
+               and len(self.resolvers) < self._slot_limit(self.max_resolvers, self.resolve_queue[0][0])):
+            _, _, video_id = heapq.heappop(self.resolve_queue)
+            if video_id not in self._resolving:
+                # 已被取消
+                continue
+
+            url, _ = self._resolving[video_id]
+            resolver = ResolveWorker(video_id, url)
+            resolver.resolved.connect(self._on_resolved)
+            resolver.cover_ready.connect(self._on_cover_ready)
+            resolver.finished.connect(lambda vid=video_id: self._cleanup_resolver(vid))
+            self.resolvers[video_id] = resolver
+            resolver.start()
+
+    def _on_resolved(self, video_id: str, video_info_obj):
+        """解析完成：更新卡片并加入下载队列"""
+        if video_id not in self._resolving:
+            # 任务在解析期间被删除
+            return
+
+        url, priority = self._resolving.pop(video_id)
+
+        # 解析后按 aweme_id 再查一次历史（同一作品可能来自不同链接）
+        record = None
+        if video_info_obj and video_info_obj.aweme_id:
+            try:
+                record = get_history().find_by_aweme_id(video_info_obj.aweme_id)
+                if record:
+                    get_history().add_alias(url, video_info_obj.aweme_id)
+            except Exception as e:
+                print(f"⚠️ 查询下载历史失败: {e}")
+        if record:
+            self.video_info_updated.emit(video_id, self._build_history_video_data(video_id, url, record))
+            self._set_status(video_id, "success")
+            self.download_skipped.emit(video_id, record)
+            self._enqueue_postprocess(video_id, record["files"], record.get("aweme_id"))
+            return
+
+        if video_info_obj:
+            self.video_infos[video_id] = video_info_obj
+
+        video_data = self._build_video_data(video_id, url, video_info_obj, "pending")
+        self.video_info_updated.emit(video_id, video_data)
+        self._set_status(video_id, "pending")
+
+        # 解析失败时仍然尝试下载（下载线程会重新解析）
+        self.start_download(video_id, url, priority)
+
+    def _on_cover_ready(self, video_id: str, cover: str):
+        """封面下载完成：立即显示，并留给后处理使用"""
+        status = self.task_store.get_status(video_id)
+        if status is None:
+            # 任务已删除
+            return
+        if status in ("pending", "downloading"):
+            self.covers[video_id] = cover
+        self.cover_ready.emit(video_id, cover)
+
+    def _cleanup_resolver(self, video_id: str):
+        """清理解析线程"""
+        resolver = self.resolvers.pop(video_id, None)
+        if resolver:
+            resolver.deleteLater()
+
+        self._schedule_resolves()
+
+    def start_download(self, video_id: str, url: str, priority: int = PRIORITY_NORMAL):
         """
-        开始下载
+        开始下载（加入等待队列，有空闲槽位时立即执行）
         :param video_id: 视频ID
         :param url: 视频URL
+        :param priority: 优先级，数值越小越先执行
+        """
+        if video_id in self.workers or video_id in self._queued_ids:
+            return
+
+        heapq.heappush(self.pending_queue, (priority, next(self._queue_seq), video_id, url))
+        self._queued_ids.add(video_id)
+        self._schedule()
+
+    def _schedule(self):
+        """从等待队列中取出任务，填满空闲的工作槽位"""
+        while (self.pending_queue
+               and len(self.workers) < self._slot_limit(self.max_workers, self.pending_queue[0][0])):
+            priority, _, video_id, url = heapq.heappop(self.pending_queue)
+            if video_id not in self._queued_ids or video_id in self.workers:
+                # 已被取消或已在下载
+                continue
+            self._queued_ids.discard(video_id)
+            self._launch_worker(video_id, url, priority)
+
+    def _launch_worker(self, video_id: str, url: str, priority: int = PRIORITY_NORMAL):
+        """
+        启动下载工作线程
+        :param video_id: 视频ID
+        :param url: 视频URL
+        :param priority: 优先级
         """
         # 创建下载工作线程
-        worker = DownloadWorker(video_id, url, self.download_dir)
+        worker = DownloadWorker(video_id, url, self.download_dir, self.video_infos.pop(video_id, None),
+                                self.progress_table, priority)
 
         # 连接信号
-        worker.progress_updated.connect(self.progress_updated)
-        worker.status_changed.connect(self.status_changed)
-        worker.download_completed.connect(self.download_completed)
-        worker.error_occurred.connect(self.error_occurred)
+        worker.status_changed.connect(self._set_status)
+        worker.download_completed.connect(self._on_download_completed)
+        worker.error_occurred.connect(self._on_download_error)
 
         # 线程完成后清理
         worker.finished.connect(lambda: self._cleanup_worker(video_id))
@@ -183,6 +508,9 @@ class DownloadManager(QObject):
         self.workers[video_id] = worker
         worker.start()
 
+        if not self.progress_timer.isActive():
+            self.progress_timer.start()
+
     def _cleanup_worker(self, video_id: str):
         """清理工作线程"""
         if video_id in self.workers:
@@ -190,6 +518,128 @@ class DownloadManager(QObject):
             worker.deleteLater()
             del self.workers[video_id]
 
+        self.covers.pop(video_id, None)
+
+        # 发出该任务最后的进度后移除
+        self.flush_progress()
+        self.progress_table.remove(video_id)
+
+        # 释放槽位后调度下一个任务
+        self._schedule()
+
+        if not self.workers:
+            self.progress_timer.stop()
+
+    def _on_download_completed(self, video_id: str, result: Dict[str, Any]):
+        """下载完成：通知界面，并把文件交给后处理队列"""
+        if self.task_store.get_status(video_id) is None:
+            # 任务在下载期间被删除，卡片已不存在
+            return
+        self.download_completed.emit(video_id, result)
+        downloaded_files = result.get("downloaded_files", [])
+        if downloaded_files:
+            aweme_id = (result.get("video_info") or {}).get("aweme_id")
+            self._enqueue_postprocess(video_id, downloaded_files, aweme_id, self.covers.pop(video_id, None))
+
+    def _on_download_error(self, video_id: str, error: str):
+        """下载失败：已删除的任务不再通知界面"""
+        if self.task_store.get_status(video_id) is not None:
+            self.error_occurred.emit(video_id, error)
+
+    def _enqueue_postprocess(self, video_id: str, files: List[Dict[str, Any]], aweme_id: Optional[str],
+                             cover: Optional[str] = None):
+        """
+        把文件交给后处理队列（下载完成或从历史记录恢复的任务）
+        MP4 的时长和分辨率直接解析文件头得到，只有缺少缩略图时才启动 ffmpeg
+        """
+        cover = cover or get_cached_cover(aweme_id)
+        self.postprocess_queue.append((video_id, files, aweme_id, cover))
+        self._schedule_postprocess()
+
+    def _schedule_postprocess(self):
+        """启动后处理线程，填满空闲的后处理槽位"""
+        while len(self.postprocessors) < self.max_postprocessors and self.postprocess_queue:
+            video_id, downloaded_files, aweme_id, cover = self.postprocess_queue.popleft()
+            if video_id in self.postprocessors:
+                continue
+
+            processor = PostProcessWorker(video_id, downloaded_files, aweme_id, cover)
+            processor.processed.connect(self.media_info_ready)
+            processor.finished.connect(lambda vid=video_id: self._cleanup_postprocessor(vid))
+            self.postprocessors[video_id] = processor
+            processor.start()
+
+    def _cleanup_postprocessor(self, video_id: str):
+        """清理后处理线程"""
+        processor = self.postprocessors.pop(video_id, None)
+        if processor:
+            processor.deleteLater()
+
+        self._schedule_postprocess()
+
+    def flush_progress(self):
+        """把进度表中有变化的条目一次性发给界面"""
+        changes = self.progress_table.take_changes()
+        if changes:
+            for video_id, change in changes.items():
+                self.task_store.update_transfer(video_id, change["downloaded"], change["speed"])
+            self.progress_batch.emit(changes)
+            self._emit_stats()
+
+    def _set_status(self, video_id: str, status: str):
+        """更新任务状态并通知界面（已删除的任务忽略）"""
+        if self.task_store.set_status(video_id, status):
+            self.status_changed.emit(video_id, status)
+            self._emit_stats()
+
+    def _emit_stats(self):
+        """发出最新的任务统计"""
+        self.stats_changed.emit(self.task_store.stats())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取任务统计（O(1)，不遍历任务）
+        :return: {"total", "resolving", "pending", "downloading", "success", "error", "bytes_done", "rate"}
+        """
+        return self.task_store.stats()
+
+    def cancel_pending(self, video_id: str) -> bool:
+        """
+        取消尚未开始的任务
+        :return: 是否取消成功（已开始的任务无法取消）
+        """
+        if video_id in self._resolving:
+            del self._resolving[video_id]
+            return True
+        if video_id in self._queued_ids:
+            self._queued_ids.discard(video_id)
+            self.video_infos.pop(video_id, None)
+            return True
+        return False
+
+    def remove_task(self, video_id: str):
+        """
+        删除任务：取消尚未开始的下载，并从任务统计中移除
+        已开始的下载会继续完成，但不再更新界面和统计
+        """
+        self.cancel_pending(video_id)
+        self.covers.pop(video_id, None)
+        self.task_store.remove(video_id)
+        self._emit_stats()
+
+    def set_max_workers(self, max_workers: int):
+        """设置最大并发下载数"""
+        self.max_workers = max(1, int(max_workers))
+        self._schedule()
+
+    def get_active_count(self) -> int:
+        """获取正在下载的任务数"""
+        return len(self.workers)
+
+    def get_pending_count(self) -> int:
+        """获取等待中的任务数"""
+        return len(self._queued_ids)
+
     def _format_size(self, size_bytes: int) -> str:
         """格式化文件大小"""
         if size_bytes == 0:
@@ -223,3 +673,15 @@ class DownloadManager(QObject):
         """设置下载目录"""
         self.download_dir = directory
         os.makedirs(directory, exist_ok=True)
+
+    def get_rate_limit(self) -> int:
+        """获取总下载速度上限（字节/秒，0 表示不限速）"""
+        return get_bandwidth_limiter().rate
+
+    def set_rate_limit(self, rate: int):
+        """
+        设置总下载速度上限，正在进行的下载立即生效
+        :param rate: 字节/秒，0 表示不限速
+        """
+        get_bandwidth_limiter().set_rate(rate)
+        print(f"🚦 下载限速: {f'{rate / 1024:.0f} KB/s' if rate > 0 else '不限速'}")
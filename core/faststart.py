@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MP4 快速启动（faststart）
+把位于文件末尾的 moov 移到媒体数据之前，播放器读到文件开头就能开始播放；
+不重新编码：只修改 moov 中的块偏移表（stco/co64），媒体数据用固定大小的缓冲区流式复制
+"""
+
+import os
+import sys
+import struct
+from typing import Optional, List, Tuple
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.mp4_parser import BOX_HEADER, LARGE_SIZE, CONTAINER_BOXES, iter_boxes
+
+# 复制媒体数据的缓冲区大小（内存占用与文件大小无关）
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# 临时文件后缀
+FASTSTART_SUFFIX = ".faststart"
+
+UINT32_MAX = 0xFFFFFFFF
+
+
+def _read_top_level_boxes(f, file_size: int) -> List[Tuple[bytes, int, int, int]]:
+    """读取顶层盒子列表（只读盒子头）：[(类型, 起始位置, 大小, 头部大小)]"""
+    boxes = []
+    offset = 0
+    while offset + BOX_HEADER.size <= file_size:
+        f.seek(offset)
+        header = f.read(16)
+        size, box_type = BOX_HEADER.unpack_from(header, 0)
+        header_size = BOX_HEADER.size
+        if size == 1:
+            size = LARGE_SIZE.unpack_from(header, 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = file_size - offset
+        if size < header_size or offset + size > file_size:
+            raise ValueError(f"盒子 {box_type!r} 大小异常")
+        boxes.append((box_type, offset, size, header_size))
+        offset += size
+    return boxes
+
+
+def needs_faststart(path: str) -> bool:
+    """moov 是否位于媒体数据之后（需要移动）"""
+    try:
+        with open(path, 'rb') as f:
+            boxes = _read_top_level_boxes(f, os.fstat(f.fileno()).st_size)
+    except (OSError, ValueError, struct.error):
+        return False
+    types = [box[0] for box in boxes]
+    if b"moov" not in types or b"mdat" not in types or b"moof" in types:
+        # 不是普通 MP4 或是分片 MP4
+        return False
+    return types.index(b"moov") > types.index(b"mdat")
+
+
+def _chunk_offset_tables(moov: bytearray, start: int, end: int, found: List[Tuple[bytes, int]]):
+    """收集 moov 中所有 stco/co64 盒子的 (类型, 内容起始位置)"""
+    for box_type, offset, size, header_size in iter_boxes(moov, start, end):
+        if box_type in CONTAINER_BOXES:
+            _chunk_offset_tables(moov, offset + header_size, offset + size, found)
+        elif box_type in (b"stco", b"co64"):
+            found.append((box_type, offset + header_size))
+
+
+def _convert_stco_to_co64(moov: bytes, start: int, end: int) -> bytes:
+    """
+    把 moov 中的 32 位偏移表（stco）改为 64 位（co64），并更新各级容器的大小
+    :return: [start, end) 范围内重新生成的盒子
+    """
+    result = bytearray()
+    for box_type, offset, size, header_size in iter_boxes(moov, start, end):
+        if box_type in CONTAINER_BOXES:
+            content = _convert_stco_to_co64(moov, offset + header_size, offset + size)
+            result += BOX_HEADER.pack(BOX_HEADER.size + len(content), box_type) + content
+        elif box_type == b"stco":
+            body = offset + header_size
+            count = struct.unpack_from(">I", moov, body + 4)[0]
+            entries = struct.unpack_from(f">{count}I", moov, body + 8)
+            result += BOX_HEADER.pack(BOX_HEADER.size + 8 + count * 8, b"co64")
+            result += moov[body:body + 8] + struct.pack(f">{count}Q", *entries)
+        else:
+            result += moov[offset:offset + size]
+    return bytes(result)
+
+
+def relocate_moov(moov: bytes, shift: int, header_size: int = BOX_HEADER.size) -> bytes:
+    """
+    生成移动后的 moov：所有块偏移加上 shift
+    偏移超出 32 位时先把 stco 改为 co64（moov 变大，偏移量随之增加）
+    :param header_size: moov 的盒子头大小（使用 64 位大小时为 16）
+    """
+    data = bytearray(moov)
+    tables: List[Tuple[bytes, int]] = []
+    _chunk_offset_tables(data, header_size, len(data), tables)
+
+    for box_type, body in tables:
+        if box_type != b"stco":
+            continue
+        count = struct.unpack_from(">I", data, body + 4)[0]
+        if count and max(struct.unpack_from(f">{count}I", data, body + 8)) + shift + 8 * count > UINT32_MAX:
+            content = _convert_stco_to_co64(moov, header_size, len(moov))
+            converted = BOX_HEADER.pack(BOX_HEADER.size + len(content), b"moov") + content
+            return relocate_moov(converted, shift + len(converted) - len(moov))
+
+    for box_type, body in tables:
+        count = struct.unpack_from(">I", data, body + 4)[0]
+        if box_type == b"stco":
+            fmt = f">{count}I"
+        else:
+            fmt = f">{count}Q"
+        offsets = struct.unpack_from(fmt, data, body + 8)
+        struct.pack_into(fmt, data, body + 8, *(value + shift for value in offsets))
+    return bytes(data)
+
+
+def _copy_range(src, dst, offset: int, length: int, buffer: memoryview):
+    """把 src 中 [offset, offset + length) 流式复制到 dst"""
+    src.seek(offset)
+    while length > 0:
+        n = src.readinto(buffer[:min(length, len(buffer))])
+        if not n:
+            raise IOError("文件提前结束")
+        dst.write(buffer[:n])
+        length -= n
+
+
+def make_faststart(path: str, output_path: Optional[str] = None,
+                   buffer_size: int = COPY_BUFFER_SIZE) -> bool:
+    """
+    把 moov 移到文件开头
+    :param path: MP4 文件路径
+    :param output_path: 输出路径，为空时替换原文件
+    :param buffer_size: 复制缓冲区大小
+    :return: 是否进行了移动（已是 faststart 或无法处理时返回 False，原文件不变）
+    """
+    if not needs_faststart(path):
+        return False
+
+    target = output_path or path
+    tmp_path = target + FASTSTART_SUFFIX
+    try:
+        with open(path, 'rb') as src:
+            boxes = _read_top_level_boxes(src, os.fstat(src.fileno()).st_size)
+            moov_box = next(box for box in boxes if box[0] == b"moov")
+            first_mdat = next(i for i, box in enumerate(boxes) if box[0] == b"mdat")
+            if any(box[0] == b"mdat" and box[1] > moov_box[1] for box in boxes):
+                # moov 之后还有媒体数据时，这部分数据的偏移不变，不能统一加上 moov 大小
+                print("⚠️ moov 之后仍有媒体数据，不移动 moov")
+                return False
+
+            # moov 插入到第一个 mdat 之前，其后到原 moov 位置之间的数据整体后移
+            src.seek(moov_box[1])
+            moov = relocate_moov(src.read(moov_box[2]), moov_box[2], moov_box[3])
+            order = boxes[:first_mdat] + [None] + [box for box in boxes[first_mdat:] if box is not moov_box]
+
+            buffer = memoryview(bytearray(buffer_size))
+            with open(tmp_path, 'wb') as dst:
+                for box in order:
+                    if box is None:
+                        dst.write(moov)
+                    else:
+                        _copy_range(src, dst, box[1], box[2], buffer)
+
+        os.replace(tmp_path, target)
+        return True
+
+    except (OSError, ValueError, struct.error, StopIteration) as e:
+        print(f"⚠️ 移动 moov 失败，保留原文件: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+
+
+if __name__ == "__main__":
+    import time
+    import tempfile
+    import subprocess
+    import tracemalloc
+
+    from core.mp4_parser import parse_mp4
+    from core.thumbnail_extractor import find_ffmpeg
+
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        print("❌ ffmpeg 不可用，无法生成测试视频")
+        sys.exit(1)
+
+    seconds = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 生成 moov 在末尾的高码率测试视频
+        path = os.path.join(tmp_dir, "sample.mp4")
+        subprocess.run([ffmpeg, "-v", "error", "-f", "lavfi", "-i", f"testsrc2=size=1920x1080:rate=30:duration={seconds}",
+                        "-f", "lavfi", "-i", f"sine=duration={seconds}", "-c:v", "libx264", "-preset", "ultrafast",
+                        "-b:v", "40M", "-c:a", "aac", "-shortest", "-y", path], check=True)
+        size = os.path.getsize(path)
+        before = parse_mp4(path)
+        print(f"测试文件: {size / 1024 / 1024:.0f} MB，moov {before.moov_size / 1024:.0f} KB，"
+              f"faststart={before.is_faststart}")
+
+        output = os.path.join(tmp_dir, "faststart.mp4")
+        tracemalloc.start()
+        began = time.perf_counter()
+        make_faststart(path, output)
+        elapsed = time.perf_counter() - began
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        after = parse_mp4(output)
+        print(f"耗时 {elapsed:.2f}s（{size / elapsed / 1024 / 1024:.0f} MB/s），Python 内存峰值 {peak / 1024 / 1024:.1f} MB")
+        print(f"输出: faststart={after.is_faststart}，时长 {after.duration:.1f}s，{after.width}x{after.height}")
+
+        # 校验：两个文件逐帧的数据哈希一致
+        def frame_hashes(file_path: str) -> List[str]:
+            result = subprocess.run([ffmpeg, "-v", "error", "-i", file_path, "-map", "0", "-c", "copy",
+                                     "-f", "framemd5", "-"], stdout=subprocess.PIPE, check=True)
+            return [line for line in result.stdout.decode().splitlines() if not line.startswith("#")]
+
+        print(f"逐帧校验: {'一致' if frame_hashes(path) == frame_hashes(output) else '不一致'}")
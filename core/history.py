@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+下载历史 - 基于 SQLite 的本地索引
+按 aweme_id 记录已下载的文件（路径、大小、SHA-256、时间），用于跳过重复下载
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional, List, Dict, Any
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.config import get_cache_dir
+
+
+def file_sha256(path: str, block_size: int = 1024 * 1024) -> str:
+    """计算文件的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DownloadHistory:
+    """下载历史索引"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS downloads (
+        aweme_id TEXT PRIMARY KEY,
+        url TEXT,
+        title TEXT,
+        type TEXT,
+        files TEXT NOT NULL,
+        total_size INTEGER NOT NULL DEFAULT 0,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS url_aliases (
+        url TEXT PRIMARY KEY,
+        aweme_id TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_downloads_updated ON downloads(updated_at);
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # 下载线程和界面线程共用一个连接，由锁串行化访问
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+            self._conn.commit()
+
+    def _row_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """数据库行转为字典"""
+        entry = dict(row)
+        entry["files"] = json.loads(entry["files"])
+        return entry
+
+    def _files_exist(self, entry: Dict[str, Any]) -> bool:
+        """记录中的文件是否仍在磁盘上且大小一致"""
+        files = [f for f in entry["files"] if f.get("type") in ("video", "image")]
+        if not files:
+            return False
+        for file_info in files:
+            try:
+                if os.path.getsize(file_info["path"]) != file_info.get("size"):
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def find_by_aweme_id(self, aweme_id: str, verify_files: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        按 aweme_id 查询
+        :param verify_files: 是否检查文件仍存在（文件被删除时视为未下载）
+        """
+        if not aweme_id:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM downloads WHERE aweme_id = ?", (aweme_id,)).fetchone()
+        if row is None:
+            return None
+        entry = self._row_to_dict(row)
+        if verify_files and not self._files_exist(entry):
+            return None
+        return entry
+
+    def find_by_url(self, url: str, verify_files: bool = True) -> Optional[Dict[str, Any]]:
+        """按粘贴过的链接查询"""
+        with self._lock:
+            row = self._conn.execute("SELECT aweme_id FROM url_aliases WHERE url = ?", (url,)).fetchone()
+        return self.find_by_aweme_id(row["aweme_id"], verify_files) if row else None
+
+    def record(self, aweme_id: str, url: str, title: str, post_type: str, files: List[Dict[str, Any]]):
+        """
+        记录一次完成的下载
+        :param files: 下载结果中的文件列表（每项含 path、size，可含 sha256）
+        """
+        if not aweme_id:
+            return
+        now = time.time()
+        total_size = sum(f.get("size") or 0 for f in files)
+        with self._lock:
+            # 重复下载时保留首次下载时间
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO downloads
+                    (aweme_id, url, title, type, files, total_size, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?,
+                        COALESCE((SELECT created_at FROM downloads WHERE aweme_id = ?), ?), ?)
+                """,
+                (aweme_id, url, title, post_type, json.dumps(files, ensure_ascii=False), total_size,
+                 aweme_id, now, now)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO url_aliases (url, aweme_id) VALUES (?, ?)", (url, aweme_id)
+            )
+            self._conn.commit()
+
+    def update_files(self, aweme_id: str, files: List[Dict[str, Any]]):
+        """
+        更新记录中的文件列表（如后处理补充的缩略图），不改变完成时间
+        """
+        if not aweme_id:
+            return
+        with self._lock:
+            self._conn.execute(
+                "UPDATE downloads SET files = ? WHERE aweme_id = ?",
+                (json.dumps(files, ensure_ascii=False), aweme_id)
+            )
+            self._conn.commit()
+
+    def add_alias(self, url: str, aweme_id: str):
+        """记录链接与 aweme_id 的对应关系"""
+        if not url or not aweme_id:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO url_aliases (url, aweme_id) VALUES (?, ?)", (url, aweme_id)
+            )
+            self._conn.commit()
+
+    def list_entries(self, limit: int = 1000, offset: int = 0) -> List[Dict[str, Any]]:
+        """按完成时间倒序列出历史记录"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM downloads ORDER BY updated_at DESC LIMIT ? OFFSET ?", (limit, offset)
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def count(self) -> int:
+        """历史记录数量"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM downloads").fetchone()[0]
+
+    def remove(self, aweme_id: str):
+        """删除历史记录（不删除文件）"""
+        with self._lock:
+            self._conn.execute("DELETE FROM downloads WHERE aweme_id = ?", (aweme_id,))
+            self._conn.execute("DELETE FROM url_aliases WHERE aweme_id = ?", (aweme_id,))
+            self._conn.commit()
+
+    def close(self):
+        """关闭数据库"""
+        with self._lock:
+            self._conn.close()
+
+
+_history: Optional[DownloadHistory] = None
+_history_lock = threading.Lock()
+
+
+def get_history() -> DownloadHistory:
+    """获取进程内共享的下载历史"""
+    global _history
+    if _history is None:
+        with _history_lock:
+            if _history is None:
+                _history = DownloadHistory(os.path.join(get_cache_dir(), "history.db"))
+    return _history
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+共享 HTTP 传输层
+所有提取器和下载线程共用一个带连接池的 requests.Session，复用 TCP/TLS 连接
+"""
+
+import os
+import sys
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.config import get_setting
+
+# 默认请求头（移动端 UA，分享页返回内嵌数据）
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Linux; Android 11; SAMSUNG SM-G973U) AppleWebKit/537.36 (KHTML, like Gecko) SamsungBrowser/14.2 Chrome/87.0.4280.141 Mobile Safari/537.36"
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _create_session() -> requests.Session:
+    """创建带连接池的会话"""
+    # pool_connections: 缓存的主机连接池数量
+    # pool_maxsize: 每个主机最多保持的连接数
+    # pool_block: 连接数达到上限时等待空闲连接，而不是新建连接
+    adapter = HTTPAdapter(
+        pool_connections=int(get_setting("network", "pool_connections", 16)),
+        pool_maxsize=int(get_setting("network", "pool_maxsize", 16)),
+        pool_block=bool(get_setting("network", "pool_block", True)),
+        max_retries=0
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": DEFAULT_USER_AGENT,
+        "Connection": "keep-alive"
+    })
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    获取进程内共享的会话
+    urllib3 连接池本身是线程安全的，各线程只使用 get/head 等无状态请求
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _create_session()
+    return _session
+
+
+def close_session():
+    """关闭共享会话，释放所有连接（退出程序时调用）"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
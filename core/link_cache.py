@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+短链接解析缓存
+把 v.douyin.com / dy.tt 短链接映射到重定向后的分享页地址和 aweme_id，持久化到磁盘
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import threading
+from typing import Optional, Dict, Any
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.config import get_setting, get_cache_dir
+
+SHORT_LINK_REGEX = re.compile(r'^https?://(?:v\.douyin\.com|dy\.tt)/', re.IGNORECASE)
+AWEME_ID_URL_REGEX = re.compile(r'/(?:video|note|slides)/(\d+)')
+
+
+def is_short_link(url: str) -> bool:
+    """是否为需要重定向的短链接"""
+    return bool(SHORT_LINK_REGEX.match(url))
+
+
+def lookup_aweme_id(url: str) -> Optional[str]:
+    """
+    不发起网络请求获取链接对应的 aweme_id
+    完整链接直接从路径中提取，短链接查询解析缓存
+    """
+    match = AWEME_ID_URL_REGEX.search(url)
+    if match:
+        return match.group(1)
+    if is_short_link(url):
+        entry = get_link_cache().get(url)
+        if entry:
+            return entry.get("aweme_id")
+    return None
+
+
+class LinkCache:
+    """
+    短链接解析缓存
+    条目超过 ttl 秒过期；超过 max_entries 时淘汰最久未使用的条目
+    """
+
+    def __init__(self, path: str, ttl: float = 7 * 86400, max_entries: int = 5000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False  # 查询更新了使用时间或删除了过期条目，尚未写回磁盘
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """首次使用时从磁盘读取（调用方持有锁）"""
+        if self._entries is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        """写回磁盘（调用方持有锁）"""
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+        except OSError as e:
+            print(f"⚠️ 保存短链接缓存失败: {e}")
+
+    def get(self, short_url: str) -> Optional[Dict[str, Any]]:
+        """
+        查询短链接
+        :return: {"url": 分享页地址, "aweme_id": 作品ID}，未命中或过期返回 None
+        """
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(short_url)
+            if entry is None:
+                return None
+            now = time.time()
+            if now - entry.get("created_at", 0) > self.ttl:
+                del entries[short_url]
+                self._dirty = True
+                return None
+            entry["last_used"] = now
+            # 使用时间随下一次 put 或 flush 写回，查询本身不写盘
+            self._dirty = True
+            return entry
+
+    def put(self, short_url: str, url: str, aweme_id: Optional[str]):
+        """记录短链接的解析结果"""
+        with self._lock:
+            entries = self._load()
+            now = time.time()
+            entries[short_url] = {
+                "url": url,
+                "aweme_id": aweme_id,
+                "created_at": now,
+                "last_used": now
+            }
+
+            if len(entries) > self.max_entries:
+                # 淘汰最久未使用的条目
+                overflow = len(entries) - self.max_entries
+                for key in sorted(entries, key=lambda k: entries[k].get("last_used", 0))[:overflow]:
+                    del entries[key]
+
+            self._save()
+
+    def flush(self):
+        """把查询产生的改动（使用时间、过期删除）写回磁盘"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def invalidate(self, short_url: str):
+        """删除条目（缓存的地址失效时调用）"""
+        with self._lock:
+            if self._load().pop(short_url, None) is not None:
+                self._save()
+
+
+_link_cache: Optional[LinkCache] = None
+_link_cache_lock = threading.Lock()
+
+
+def get_link_cache() -> LinkCache:
+    """获取进程内共享的短链接缓存"""
+    global _link_cache
+    if _link_cache is None:
+        with _link_cache_lock:
+            if _link_cache is None:
+                _link_cache = LinkCache(
+                    os.path.join(get_cache_dir(), "short_links.json"),
+                    ttl=float(get_setting("cache", "short_link_ttl", 7 * 86400)),
+                    max_entries=int(get_setting("cache", "short_link_max_entries", 5000))
+                )
+    return _link_cache
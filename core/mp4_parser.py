@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MP4（ISO-BMFF）盒子解析
+通过内存映射只读取 moov 中需要的盒子，得到时长、分辨率、编码和码率，不需要 ffmpeg；
+只用于已下载完成的文件：下载中的 .part 预分配为完整大小，未写入的区域全是 0，无法判断 moov 是否完整
+"""
+
+import os
+import mmap
+import struct
+from typing import Optional, Iterator, Tuple, Dict, Any
+
+# 盒子头：32 位大小 + 4 字节类型；大小为 1 时后跟 64 位大小，为 0 时延伸到文件末尾
+BOX_HEADER = struct.Struct(">I4s")
+LARGE_SIZE = struct.Struct(">Q")
+
+# 容器盒子（只进入这些盒子查找子盒子）
+CONTAINER_BOXES = {b"moov", b"trak", b"mdia", b"minf", b"stbl", b"edts"}
+
+# 样本描述中的编码标识 -> 与 ffmpeg 一致的编码名称
+CODEC_NAMES = {
+    b"avc1": "h264", b"avc3": "h264",
+    b"hvc1": "hevc", b"hev1": "hevc",
+    b"av01": "av1", b"vp09": "vp9",
+    b"mp4a": "aac", b"Opus": "opus", b"ac-3": "ac3", b".mp3": "mp3",
+}
+
+
+class Mp4Info:
+    """MP4 文件信息"""
+
+    def __init__(self):
+        self.duration: float = 0  # 秒
+        self.width: int = 0
+        self.height: int = 0
+        self.video_codec: Optional[str] = None
+        self.audio_codec: Optional[str] = None
+        self.bitrate: int = 0  # 比特/秒（音视频样本总大小 / 时长）
+        self.moov_offset: int = 0
+        self.moov_size: int = 0
+        self.mdat_offset: Optional[int] = None
+
+    @property
+    def is_faststart(self) -> bool:
+        """moov 是否在媒体数据之前（边下边播）"""
+        return self.mdat_offset is None or self.moov_offset < self.mdat_offset
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "duration": self.duration,
+            "width": self.width,
+            "height": self.height,
+            "video_codec": self.video_codec,
+            "audio_codec": self.audio_codec,
+            "bitrate": self.bitrate,
+            "faststart": self.is_faststart,
+        }
+
+
+def iter_boxes(data, start: int, end: int) -> Iterator[Tuple[bytes, int, int, int]]:
+    """
+    遍历 [start, end) 范围内的同级盒子
+    :return: (类型, 盒子起始位置, 盒子大小, 头部大小)；盒子超出范围（文件未下载完）时停止
+    """
+    offset = start
+    while offset + BOX_HEADER.size <= end:
+        size, box_type = BOX_HEADER.unpack_from(data, offset)
+        header_size = BOX_HEADER.size
+        if size == 1:
+            if offset + 16 > end:
+                return
+            size = LARGE_SIZE.unpack_from(data, offset + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size:
+            return
+        yield box_type, offset, size, header_size
+        offset += size
+
+
+def _find_child(data, start: int, end: int, box_type: bytes) -> Optional[Tuple[int, int]]:
+    """查找子盒子，返回 (内容起始位置, 内容结束位置)"""
+    for child_type, offset, size, header_size in iter_boxes(data, start, end):
+        if child_type == box_type:
+            return offset + header_size, min(offset + size, end)
+    return None
+
+
+def _parse_mvhd(data, start: int) -> float:
+    """影片头：时长（秒）"""
+    version = data[start]
+    if version == 1:
+        timescale, duration = struct.unpack_from(">IQ", data, start + 20)
+    else:
+        timescale, duration = struct.unpack_from(">II", data, start + 12)
+    return duration / timescale if timescale else 0
+
+
+def _parse_tkhd(data, start: int) -> Tuple[int, int, bool]:
+    """轨道头：显示宽高（16.16 定点数）和是否旋转 90/270 度"""
+    version = data[start]
+    # 版本 0 的时间字段为 32 位，版本 1 为 64 位
+    matrix_offset = start + (52 if version == 1 else 40)
+    a, b = struct.unpack_from(">ii", data, matrix_offset)
+    width, height = struct.unpack_from(">II", data, matrix_offset + 36)
+    rotated = a == 0 and b != 0
+    return width >> 16, height >> 16, rotated
+
+
+def _parse_sample_sizes(data, start: int, end: int) -> int:
+    """样本大小表（stsz）：所有样本的总字节数"""
+    sample_size, sample_count = struct.unpack_from(">II", data, start + 4)
+    if sample_size:
+        return sample_size * sample_count
+    table_end = start + 12 + sample_count * 4
+    if table_end > end:
+        return 0
+    return sum(struct.unpack_from(f">{sample_count}I", data, start + 12))
+
+
+def _parse_trak(data, start: int, end: int, info: Mp4Info) -> int:
+    """
+    解析轨道：编码、宽高
+    :return: 轨道样本总字节数
+    """
+    tkhd = _find_child(data, start, end, b"tkhd")
+    mdia = _find_child(data, start, end, b"mdia")
+    if not tkhd or not mdia:
+        return 0
+
+    hdlr = _find_child(data, mdia[0], mdia[1], b"hdlr")
+    handler = bytes(data[hdlr[0] + 8:hdlr[0] + 12]) if hdlr else b""
+
+    stbl = None
+    minf = _find_child(data, mdia[0], mdia[1], b"minf")
+    if minf:
+        stbl = _find_child(data, minf[0], minf[1], b"stbl")
+    if not stbl:
+        return 0
+
+    stsd = _find_child(data, stbl[0], stbl[1], b"stsd")
+    # 第一个样本描述条目：版本/标志(4) + 条目数(4) 之后是 大小(4) + 编码标识(4)
+    fourcc = bytes(data[stsd[0] + 12:stsd[0] + 16]) if stsd else b""
+    codec = CODEC_NAMES.get(fourcc, fourcc.decode("ascii", "replace").strip() or None)
+
+    if handler == b"vide" and info.video_codec is None:
+        info.video_codec = codec
+        width, height, rotated = _parse_tkhd(data, tkhd[0])
+        if not width and stsd:
+            # 轨道头没有宽高时使用样本描述中的编码宽高
+            width, height = struct.unpack_from(">HH", data, stsd[0] + 8 + 8 + 24)
+        info.width, info.height = (height, width) if rotated else (width, height)
+    elif handler == b"soun" and info.audio_codec is None:
+        info.audio_codec = codec
+
+    stsz = _find_child(data, stbl[0], stbl[1], b"stsz")
+    return _parse_sample_sizes(data, stsz[0], stsz[1]) if stsz else 0
+
+
+def parse_moov(data, start: int, end: int, info: Mp4Info):
+    """解析 moov 盒子内容"""
+    total_bytes = 0
+    for box_type, offset, size, header_size in iter_boxes(data, start, end):
+        if box_type == b"mvhd":
+            info.duration = _parse_mvhd(data, offset + header_size)
+        elif box_type == b"trak":
+            total_bytes += _parse_trak(data, offset + header_size, offset + size, info)
+    if info.duration > 0:
+        info.bitrate = int(total_bytes * 8 / info.duration)
+
+
+def parse_mp4(path: str) -> Optional[Mp4Info]:
+    """
+    读取 MP4 文件信息
+    :param path: 已下载完成的视频文件（不支持预分配的 .part 文件）
+    :return: 文件信息；不是 MP4 或 moov 不完整（文件被截断）时返回 None
+    """
+    try:
+        with open(path, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            if file_size < BOX_HEADER.size:
+                return None
+            # 只映射不读取，访问到的页面才会从磁盘读入
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                info = Mp4Info()
+                moov = None
+                for box_type, offset, size, header_size in iter_boxes(data, 0, file_size):
+                    if box_type == b"mdat" and info.mdat_offset is None:
+                        info.mdat_offset = offset
+                    elif box_type == b"moov":
+                        if offset + size > file_size:
+                            # 文件被截断，moov 不完整
+                            return None
+                        moov = (offset + header_size, offset + size)
+                        info.moov_offset, info.moov_size = offset, size
+                        break
+                if moov is None:
+                    return None
+                parse_moov(data, moov[0], moov[1], info)
+                return info
+
+    except (OSError, ValueError, struct.error, IndexError) as e:
+        print(f"⚠️ 解析 MP4 失败: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import tempfile
+    import subprocess
+
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+    from core.thumbnail_extractor import find_ffmpeg, probe_media
+
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        print("❌ ffmpeg 不可用，无法生成测试视频")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        samples = {}
+        for name, extra in (("moov_end", []), ("faststart", ["-movflags", "+faststart"])):
+            path = os.path.join(tmp_dir, f"{name}.mp4")
+            subprocess.run([ffmpeg, "-v", "error", "-f", "lavfi", "-i", "testsrc=size=720x1280:rate=30:duration=20",
+                            "-f", "lavfi", "-i", "sine=duration=20", "-c:v", "libx264", "-c:a", "aac",
+                            "-shortest", *extra, "-y", path], check=True)
+            samples[name] = path
+
+        rounds = 1000
+        began = time.perf_counter()
+        for _ in range(rounds):
+            info = parse_mp4(samples["moov_end"])
+        parse_time = (time.perf_counter() - began) / rounds
+        print(f"parse_mp4: {parse_time * 1e6:.0f} µs/文件  {info.to_dict()}")
+
+        began = time.perf_counter()
+        media = probe_media(samples["moov_end"], os.path.join(tmp_dir, "thumb.jpg"))
+        print(f"ffmpeg: {(time.perf_counter() - began) * 1e3:.0f} ms/文件  {media.to_dict()}")
+
+        # 截断的文件：只保留前 10%
+        for name, path in samples.items():
+            truncated_path = path + ".truncated"
+            with open(path, 'rb') as src, open(truncated_path, 'wb') as dst:
+                dst.write(src.read(os.path.getsize(path) // 10))
+            result = parse_mp4(truncated_path)
+            print(f"{name} 前 10%: {result.to_dict() if result else '无法解析（moov 在文件末尾）'}")
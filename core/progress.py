@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+下载进度表
+下载线程只写入进度表，不逐条发送信号；界面定时取出有变化的条目批量刷新
+"""
+
+import time
+import threading
+from typing import Optional, Dict, Any
+
+# 速度平滑系数（指数移动平均）
+SPEED_SMOOTHING = 0.3
+
+
+class ProgressTable:
+    """线程安全的下载进度表"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = set()
+
+    def _entry(self, video_id: str) -> Dict[str, Any]:
+        """获取或创建条目（调用方持有锁）"""
+        entry = self._entries.get(video_id)
+        if entry is None:
+            entry = self._entries[video_id] = {
+                "progress": 0,
+                "message": "",
+                "downloaded": 0,
+                "total": 0,
+                "speed": 0.0,
+                "eta": None,
+                # 上次计算速度时的采样
+                "sample_bytes": 0,
+                "sample_time": time.monotonic()
+            }
+        return entry
+
+    def update(self, video_id: str, progress: int, message: str = ""):
+        """
+        记录进度百分比
+        :param video_id: 视频ID
+        :param progress: 进度（0-100）
+        :param message: 进度说明
+        """
+        with self._lock:
+            entry = self._entry(video_id)
+            if entry["progress"] != progress or entry["message"] != message:
+                entry["progress"] = progress
+                entry["message"] = message
+                self._dirty.add(video_id)
+
+    def update_bytes(self, video_id: str, downloaded: int, total: int = 0):
+        """
+        记录已传输字节数
+        :param total: 总字节数，未知时为 0
+        """
+        with self._lock:
+            entry = self._entry(video_id)
+            if entry["downloaded"] == 0 and entry["sample_bytes"] == 0:
+                # 首次上报（续传时从断点开始），不计入速度
+                entry["sample_bytes"] = downloaded
+                entry["sample_time"] = time.monotonic()
+            entry["downloaded"] = downloaded
+            entry["total"] = total
+            self._dirty.add(video_id)
+
+    def remove(self, video_id: str):
+        """删除条目"""
+        with self._lock:
+            self._entries.pop(video_id, None)
+            self._dirty.discard(video_id)
+
+    def take_changes(self) -> Dict[str, Dict[str, Any]]:
+        """
+        取出上次调用以来有变化的条目，同时更新传输速度和剩余时间
+        :return: {video_id: {"progress", "message", "downloaded", "total", "speed", "eta"}}
+        """
+        now = time.monotonic()
+        changes = {}
+        with self._lock:
+            for video_id in self._dirty:
+                entry = self._entries[video_id]
+                elapsed = now - entry["sample_time"]
+                if elapsed > 0:
+                    speed = max(0, entry["downloaded"] - entry["sample_bytes"]) / elapsed
+                    entry["speed"] = (speed if entry["speed"] == 0
+                                      else entry["speed"] + SPEED_SMOOTHING * (speed - entry["speed"]))
+                    entry["sample_bytes"] = entry["downloaded"]
+                    entry["sample_time"] = now
+
+                remaining = max(0, entry["total"] - entry["downloaded"])
+                entry["eta"] = remaining / entry["speed"] if entry["total"] > 0 and entry["speed"] > 0 else None
+
+                changes[video_id] = {key: entry[key] for key in
+                                     ("progress", "message", "downloaded", "total", "speed", "eta")}
+            self._dirty.clear()
+        return changes
+
+    def get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """查询单个条目"""
+        with self._lock:
+            entry = self._entries.get(video_id)
+            return dict(entry) if entry else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
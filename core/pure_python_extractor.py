@@ -3,27 +3,34 @@
 
 """
 纯 Python 实现的抖音视频提取器
-不依赖 douyinVd 服务，使用正则表达式解析网页
+不依赖 douyinVd 服务，解析网页内嵌的 JSON 数据（正则表达式作为兜底）
 """
 
 import re
 import os
 import json
-import subprocess
+import time
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional, List, Dict, Any
+from urllib.parse import unquote
 import requests
 import sys
 
 # 添加当前目录到路径
 sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-try:
-    from thumbnail_extractor import extract_thumbnail
-except ImportError:
-    # 如果导入失败，定义一个空函数
-    def extract_thumbnail(*args, **kwargs):
-        return None
+from core.config import get_setting
+from core.http_client import get_session
+from core.transfer import download_file
+from core.storage import StorageOptions
+from core.bandwidth import BandwidthShare
+from core.link_cache import get_link_cache, is_short_link
+from core.retry import call_with_retry, get_timeout
+from core.faststart import make_faststart, needs_faststart
 
 
 class DouyinVideoInfo:
@@ -42,6 +49,12 @@ class DouyinVideoInfo:
         self.video_url: Optional[str] = None
         self.type: Optional[str] = None
         self.image_url_list: Optional[List[str]] = None
+        self.cover_urls: List[str] = []  # 封面图地址（同一封面的多个 CDN 地址）
+        self.fetched_at: float = time.time()  # 解析时间，用于判断播放地址是否过期
+
+    def is_expired(self, ttl: float) -> bool:
+        """解析结果是否已超过有效期"""
+        return time.time() - self.fetched_at > ttl
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -57,9 +70,55 @@ class DouyinVideoInfo:
             "video_url": self.video_url,
             "type": self.type,
             "image_url_list": self.image_url_list,
+            "cover_urls": self.cover_urls,
         }
 
 
+class VideoInfoCache:
+    """
+    进程内解析结果缓存
+    按链接和 aweme_id 索引，超过 ttl 秒的条目视为过期（签名地址会失效）
+    """
+
+    def __init__(self, ttl: float = 300, max_entries: int = 512):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, DouyinVideoInfo]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[DouyinVideoInfo]:
+        """获取未过期的缓存条目"""
+        with self._lock:
+            info = self._entries.get(key)
+            if info is None:
+                return None
+            if info.is_expired(self.ttl):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return info
+
+    def put(self, info: DouyinVideoInfo, *keys: str):
+        """以多个键缓存同一条解析结果"""
+        with self._lock:
+            for key in keys:
+                if key:
+                    self._entries[key] = info
+                    self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *keys: str):
+        """删除缓存条目"""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+# 所有提取器共享的解析缓存
+video_info_cache = VideoInfoCache(ttl=get_setting("douyin", "info_cache_ttl", 300))
+
+
 class PurePythonExtractor:
     """纯 Python 抖音视频提取器"""
 
@@ -72,31 +131,104 @@ class PurePythonExtractor:
     CREATE_TIME_REGEX = re.compile(r'"create_time":\s*(\d+)')
     DESC_REGEX = re.compile(r'"desc":\s*"([^"]+)"')
 
+    # 图片集：图片地址、uri，以及从地址中取出 uri 部分（域名之后、~ 或 ? 之前）
+    IMG_URL_REGEX = re.compile(r'{"uri":"[^\s"]+","url_list":\["(https://p\d{1,2}-sign\.douyinpic\.com/[^"]+)"')
+    IMG_URI_REGEX = re.compile(r'"uri":"([^\s"]+)","url_list":')
+    IMG_URL_KEY_REGEX = re.compile(r'https://[^/]+/([^~?]+)')
+
+    # 封面图地址（只取静态封面）
+    COVER_REGEX = re.compile(r'"(?:cover|origin_cover)":\{"uri":"[^"]*","url_list":\[([^\]]*)\]')
+    COVER_KEYS = ("cover", "origin_cover")
+
+    # 文件名中不允许的字符（Windows 保留字符和控制字符）
+    INVALID_FILENAME_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f\x7f]')
+    MAX_TITLE_LENGTH = 100
+
+    # 页面内嵌数据
+    ROUTER_DATA_MARKER = "window._ROUTER_DATA"
+    RENDER_DATA_MARKER = 'id="RENDER_DATA"'
+    VIDEO_URI_PATTERN = re.compile(r'^[a-z0-9]+$')
+
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Linux; Android 11; SAMSUNG SM-G973U) AppleWebKit/537.36 (KHTML, like Gecko) SamsungBrowser/14.2 Chrome/87.0.4280.141 Mobile Safari/537.36"
-        })
+        # 使用共享会话，复用连接池
+        self.session = get_session()
 
-    def _extract_thumbnail(self, video_path: str) -> Optional[str]:
+    def _download_images(self, image_urls: List[str], title: str, output_dir: str,
+                         progress_callback=None, transfer_callback=None,
+                         bandwidth: Optional[BandwidthShare] = None) -> List[Dict[str, Any]]:
         """
-        从视频中提取缩略图
-        :param video_path: 视频文件路径
-        :return: 缩略图路径，失败返回 None
+        并发下载图片集
+        每张图片流式写入磁盘，并发数由 download.image_concurrency 控制
+        :param image_urls: 图片地址列表（按图集顺序）
+        :param title: 文件名前缀
+        :param output_dir: 输出目录
+        :param progress_callback: 进度回调函数 callback(progress, message)
+        :param transfer_callback: 字节数回调 callback(downloaded_bytes, total_bytes)，图集总大小未知时为 0
+        :param bandwidth: 限速份额，图集内的所有图片共用
+        :return: 已下载文件列表（按图集顺序）
         """
-        try:
-            # 生成缩略图路径
-            video_dir = os.path.dirname(video_path)
-            video_name = os.path.splitext(os.path.basename(video_path))[0]
-            thumbnail_path = os.path.join(video_dir, f"{video_name}_thumb.jpg")
+        total_images = len(image_urls)
+        concurrency = max(1, min(int(get_setting("download", "image_concurrency", 4)), total_images))
+        storage = StorageOptions.from_config()
+
+        lock = threading.Lock()
+        image_progress: Dict[int, float] = {}  # 下载中图片的完成比例
+        bytes_done: Dict[int, int] = {}
+        finished = [0]
+        last_progress = [None]
+
+        def report():
+            # 调用方持有 lock
+            progress = (finished[0] + sum(image_progress.values())) / total_images * 100
+            current_progress = (int(progress), finished[0])
+            if transfer_callback:
+                transfer_callback(sum(bytes_done.values()), 0)
+            if progress_callback and current_progress != last_progress[0]:
+                total_kb = sum(bytes_done.values()) / 1024
+                progress_callback(current_progress[0],
+                                  f"下载图片 {finished[0]}/{total_images} ({total_kb:.0f} KB)")
+                last_progress[0] = current_progress
+
+        def fetch(index: int, img_url: str) -> Dict[str, Any]:
+            img_filename = f"{title}_{index}.jpg"
+            img_path = os.path.join(output_dir, img_filename)
+            print(f"📥 下载图片 {index}/{total_images}: {img_filename}")
+
+            def on_image_progress(downloaded: int, total: int):
+                with lock:
+                    bytes_done[index] = downloaded
+                    if total > 0:
+                        image_progress[index] = downloaded / total
+                    report()
+
+            # 重试时从 .part 已写入的位置继续
+            size = call_with_retry(
+                lambda: download_file(self.session, img_url, img_path, on_image_progress,
+                                      timeout=get_timeout(), chunk_size=64 * 1024, storage=storage,
+                                      bandwidth=bandwidth),
+                img_url
+            )
+            with lock:
+                image_progress.pop(index, None)
+                bytes_done[index] = size
+                finished[0] += 1
+                report()
 
-            # 使用 extract_thumbnail 函数
-            result = extract_thumbnail(video_path, thumbnail_path, "00:00:01")
-            return result
+            return {
+                "type": "image",
+                "path": img_path,
+                "size": size
+            }
 
-        except Exception as e:
-            print(f"⚠️ 提取缩略图失败: {e}")
-            return None
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(fetch, i, url) for i, url in enumerate(image_urls, 1)]
+            try:
+                return [future.result() for future in futures]
+            except Exception:
+                # 任意一张失败时取消尚未开始的图片
+                for future in futures:
+                    future.cancel()
+                raise
 
     def format_date(self, timestamp: int) -> str:
         """格式化时间戳"""
@@ -104,101 +236,86 @@ class PurePythonExtractor:
         return date.strftime("%Y-%m-%d %H:%M:%S")
 
     def parse_img_list(self, body: str) -> List[str]:
-        """解析图片列表"""
-        content = body.replace(r"\u002F", "/").replace("/", "/")
-
-        img_regex = re.compile(
-            r'{"uri":"[^\s"]+","url_list":\["(https://p\d{1,2}-sign\.douyinpic\.com/[^"]+)"'
-        )
-        url_ret_regex = re.compile(r'"uri":"([^\s"]+)","url_list":')
+        """
+        解析图片列表（按图集顺序）
+        先一次遍历建立 uri -> 图片地址 的索引，再按页面中 uri 出现的顺序查表
+        """
+        content = body.replace(r"\u002F", "/")
 
-        first_urls = img_regex.findall(content)
-        url_list = url_ret_regex.findall(content)
-        url_set = set(url_list)
+        url_index: Dict[str, str] = {}
+        for url in self.IMG_URL_REGEX.findall(content):
+            # 过滤掉包含 /obj/ 的 URL
+            if "/obj/" in url:
+                continue
+            key_match = self.IMG_URL_KEY_REGEX.match(url)
+            if key_match:
+                url_index.setdefault(key_match.group(1), url)
 
         r_list = []
-        for url_set_key in url_set:
-            t = next((item for item in first_urls if url_set_key in item), None)
-            if t:
-                r_list.append(t)
-
-        # 过滤掉包含 /obj/ 的 URL
-        filtered_r_list = [url for url in r_list if "/obj/" not in url]
+        for uri in dict.fromkeys(self.IMG_URI_REGEX.findall(content)):
+            url = url_index.get(uri)
+            if url:
+                r_list.append(url)
 
-        print(f"📷 找到 {len(filtered_r_list)} 张图片")
-        return filtered_r_list
+        print(f"📷 找到 {len(r_list)} 张图片")
+        return r_list
 
-    def get_video_info(self, url: str) -> Optional[DouyinVideoInfo]:
+    def get_video_info(self, url: str, use_cache: bool = True) -> Optional[DouyinVideoInfo]:
         """
         获取视频信息
         :param url: 抖音视频链接
+        :param use_cache: 是否使用进程内解析缓存
         :return: 视频信息对象
         """
+        if use_cache:
+            cached = video_info_cache.get(url)
+            if cached:
+                print(f"♻️ 使用缓存的解析结果: {url}")
+                return cached
+
+        # 短链接：优先使用缓存的重定向结果，省去一次重定向往返
+        short_link = is_short_link(url)
+        request_url = url
+        if short_link:
+            entry = get_link_cache().get(url)
+            if entry:
+                if use_cache and entry.get("aweme_id"):
+                    cached = video_info_cache.get(f"aweme:{entry['aweme_id']}")
+                    if cached:
+                        print(f"♻️ 使用缓存的解析结果: {url}")
+                        return cached
+                request_url = entry["url"]
+                print(f"⚡ 短链接命中缓存: {request_url}")
+
         try:
             print(f"🔍 正在解析: {url}")
 
             # 请求页面
-            resp = self.session.get(url, timeout=10)
-            resp.raise_for_status()
+            try:
+                resp = call_with_retry(lambda: self._fetch_page(request_url), request_url)
+            except requests.RequestException:
+                if request_url == url:
+                    raise
+                # 缓存的地址已失效，重新走短链接重定向
+                get_link_cache().invalidate(url)
+                request_url = url
+                resp = call_with_retry(lambda: self._fetch_page(url), url)
             body = resp.text
 
-            # 判断类型（视频或图片）
-            video_type = "video"
-            img_list: List[str] = []
-            video_url = ""
-
-            match = self.VIDEO_PATTERN.search(body)
-            if not match:
-                video_type = "img"
-                print("📸 检测到图片类型")
-            else:
-                video_url = self.VIDEO_URL_TEMPLATE % match.group(1)
-                print(f"🎬 检测到视频类型")
-                print(f"📺 视频链接: {video_url}")
-
-            if video_type == "img":
-                img_list = self.parse_img_list(body)
-
-            # 解析其他信息
-            au_match = self.NICKNAME_SIGNATURE_REGEX.search(body)
-            ct_match = self.CREATE_TIME_REGEX.search(body)
-            desc_match = self.DESC_REGEX.search(body)
-            stats_match = self.STATS_REGEX.search(body)
-
-            if not stats_match:
-                print("⚠️ 未找到统计信息")
+            # 优先解析页面内嵌的 JSON 数据，失败时退回正则解析
+            douyin_video_info = self.parse_embedded_json(body)
+            if douyin_video_info is None:
+                douyin_video_info = self._parse_with_regex(body)
+            if douyin_video_info is None:
                 return None
 
-            inner_content = stats_match.group(0)
-
-            # 提取统计数据
-            aweme_id_match = re.search(r'"aweme_id"\s*:\s*"([^"]+)"', inner_content)
-            comment_count_match = re.search(r'"comment_count"\s*:\s*(\d+)', inner_content)
-            digg_count_match = re.search(r'"digg_count"\s*:\s*(\d+)', inner_content)
-            share_count_match = re.search(r'"share_count"\s*:\s*(\d+)', inner_content)
-            collect_count_match = re.search(r'"collect_count"\s*:\s*(\d+)', inner_content)
-
-            # 构建视频信息对象
-            douyin_video_info = DouyinVideoInfo()
-            douyin_video_info.aweme_id = aweme_id_match.group(1) if aweme_id_match else None
-            douyin_video_info.comment_count = int(comment_count_match.group(1)) if comment_count_match else 0
-            douyin_video_info.digg_count = int(digg_count_match.group(1)) if digg_count_match else 0
-            douyin_video_info.share_count = int(share_count_match.group(1)) if share_count_match else 0
-            douyin_video_info.collect_count = int(collect_count_match.group(1)) if collect_count_match else 0
-            douyin_video_info.video_url = video_url
-            douyin_video_info.type = video_type
-            douyin_video_info.image_url_list = img_list
-
-            if au_match:
-                douyin_video_info.nickname = au_match.group(1)
-                douyin_video_info.signature = au_match.group(2)
-
-            if ct_match:
-                timestamp = int(ct_match.group(1))
-                douyin_video_info.create_time = self.format_date(timestamp)
-
-            if desc_match:
-                douyin_video_info.desc = desc_match.group(1)
+            if short_link and request_url == url and resp.url != url:
+                get_link_cache().put(url, resp.url, douyin_video_info.aweme_id)
+
+            video_info_cache.put(
+                douyin_video_info, url,
+                f"aweme:{douyin_video_info.aweme_id}" if douyin_video_info.aweme_id else None
+            )
 
             print(f"✅ 解析成功: {douyin_video_info.desc[:50] if douyin_video_info.desc else 'N/A'}")
             return douyin_video_info
@@ -207,17 +324,229 @@ class PurePythonExtractor:
             print(f"❌ 解析失败: {e}")
             return None
 
-    def download_video(self, url: str, output_dir: str, progress_callback=None) -> Dict[str, Any]:
+    def _fetch_page(self, url: str) -> requests.Response:
+        """请求分享页面"""
+        resp = self.session.get(url, timeout=get_timeout())
+        resp.raise_for_status()
+        return resp
+
+    def _find_embedded_json(self, body: str) -> Optional[Any]:
+        """
+        定位并解码页面内嵌的数据（只解码一次）
+        支持 window._ROUTER_DATA 以及 RENDER_DATA（URL 编码）两种形式
+        """
+        decoder = json.JSONDecoder()
+
+        index = body.find(self.ROUTER_DATA_MARKER)
+        if index != -1:
+            index = body.find("=", index + len(self.ROUTER_DATA_MARKER))
+            if index != -1:
+                index += 1
+                while index < len(body) and body[index] in " \t\r\n":
+                    index += 1
+                try:
+                    data, _ = decoder.raw_decode(body, index)
+                    return data
+                except ValueError:
+                    pass
+
+        index = body.find(self.RENDER_DATA_MARKER)
+        if index != -1:
+            start = body.find(">", index) + 1
+            end = body.find("</script>", start)
+            if start > 0 and end != -1:
+                try:
+                    return json.loads(unquote(body[start:end]))
+                except ValueError:
+                    pass
+
+        return None
+
+    def _find_aweme_item(self, data: Any) -> Optional[Dict[str, Any]]:
+        """在解码后的数据中查找作品条目"""
+        # 分享页的常见结构：loaderData -> "video_(id)/page" -> videoInfoRes -> item_list[0]
+        if isinstance(data, dict):
+            for page in (data.get("loaderData") or {}).values():
+                if isinstance(page, dict):
+                    item_list = (page.get("videoInfoRes") or {}).get("item_list") or []
+                    if item_list and isinstance(item_list[0], dict):
+                        return item_list[0]
+
+        # 其他结构：广度优先查找第一个带 aweme_id 的作品条目
+        queue = deque([data])
+        while queue:
+            node = queue.popleft()
+            if isinstance(node, dict):
+                if "aweme_id" in node and ("video" in node or "images" in node):
+                    return node
+                queue.extend(value for value in node.values() if isinstance(value, (dict, list)))
+            elif isinstance(node, list):
+                queue.extend(value for value in node if isinstance(value, (dict, list)))
+        return None
+
+    def parse_embedded_json(self, body: str) -> Optional[DouyinVideoInfo]:
+        """
+        从页面内嵌的 JSON 数据构建视频信息
+        :param body: 页面 HTML
+        :return: 视频信息对象，页面结构不符合时返回 None
+        """
+        data = self._find_embedded_json(body)
+        item = self._find_aweme_item(data) if data is not None else None
+        if not item:
+            return None
+
+        douyin_video_info = DouyinVideoInfo()
+        douyin_video_info.aweme_id = str(item["aweme_id"]) if item.get("aweme_id") else None
+        douyin_video_info.desc = item.get("desc") or None
+
+        statistics = item.get("statistics") or {}
+        douyin_video_info.comment_count = int(statistics.get("comment_count") or 0)
+        douyin_video_info.digg_count = int(statistics.get("digg_count") or 0)
+        douyin_video_info.share_count = int(statistics.get("share_count") or 0)
+        douyin_video_info.collect_count = int(statistics.get("collect_count") or 0)
+
+        author = item.get("author") or {}
+        douyin_video_info.nickname = author.get("nickname")
+        douyin_video_info.signature = author.get("signature")
+
+        if item.get("create_time"):
+            douyin_video_info.create_time = self.format_date(int(item["create_time"]))
+
+        # 判断类型（视频或图片）
+        images = item.get("images") or []
+        play_uri = ((item.get("video") or {}).get("play_addr") or {}).get("uri") or ""
+        douyin_video_info.cover_urls = self._select_cover_urls(item.get("video") or {}, images)
+        if images:
+            douyin_video_info.type = "img"
+            douyin_video_info.video_url = ""
+            douyin_video_info.image_url_list = self._select_image_urls(images)
+            print("📸 检测到图片类型")
+            print(f"📷 找到 {len(douyin_video_info.image_url_list)} 张图片")
+        elif self.VIDEO_URI_PATTERN.match(play_uri):
+            douyin_video_info.type = "video"
+            douyin_video_info.video_url = self.VIDEO_URL_TEMPLATE % play_uri
+            douyin_video_info.image_url_list = []
+            print(f"🎬 检测到视频类型")
+            print(f"📺 视频链接: {douyin_video_info.video_url}")
+        else:
+            return None
+
+        return douyin_video_info
+
+    def _select_image_urls(self, images: List[Dict[str, Any]]) -> List[str]:
+        """从图片条目中为每张图片选择一个下载地址（跳过 /obj/ 原图地址）"""
+        result = []
+        for image in images:
+            url_list = image.get("url_list") or []
+            url = next((u for u in url_list if "/obj/" not in u), None)
+            if url:
+                result.append(url)
+        return result
+
+    def _file_title(self, video_info: DouyinVideoInfo) -> str:
+        """
+        由作品描述生成文件名前缀
+        描述来自页面 JSON，可能含换行、制表符：替换非法字符，合并空白，去掉末尾的点和空格（Windows 不允许）
+        """
+        title = " ".join((video_info.desc or "").split())
+        title = self.INVALID_FILENAME_CHARS.sub('_', title)[:self.MAX_TITLE_LENGTH].rstrip(". ")
+        return title or f"douyin_{video_info.aweme_id}"
+
+    def _select_cover_urls(self, video: Dict[str, Any], images: List[Dict[str, Any]]) -> List[str]:
+        """封面地址：优先用小尺寸的 cover，其次 origin_cover；图集没有封面时用第一张图片"""
+        for key in self.COVER_KEYS:
+            url_list = (video.get(key) or {}).get("url_list") or []
+            if url_list:
+                return list(url_list)
+        if images:
+            return self._select_image_urls(images[:1])
+        return []
+
+    def _parse_with_regex(self, body: str) -> Optional[DouyinVideoInfo]:
+        """正则解析（页面没有可用的内嵌 JSON 时使用）"""
+        # 判断类型（视频或图片）
+        video_type = "video"
+        img_list: List[str] = []
+        video_url = ""
+
+        match = self.VIDEO_PATTERN.search(body)
+        if not match:
+            video_type = "img"
+            print("📸 检测到图片类型")
+        else:
+            video_url = self.VIDEO_URL_TEMPLATE % match.group(1)
+            print(f"🎬 检测到视频类型")
+            print(f"📺 视频链接: {video_url}")
+
+        if video_type == "img":
+            img_list = self.parse_img_list(body)
+
+        # 解析其他信息
+        au_match = self.NICKNAME_SIGNATURE_REGEX.search(body)
+        ct_match = self.CREATE_TIME_REGEX.search(body)
+        desc_match = self.DESC_REGEX.search(body)
+        stats_match = self.STATS_REGEX.search(body)
+
+        if not stats_match:
+            print("⚠️ 未找到统计信息")
+            return None
+
+        inner_content = stats_match.group(0)
+
+        # 提取统计数据
+        aweme_id_match = re.search(r'"aweme_id"\s*:\s*"([^"]+)"', inner_content)
+        comment_count_match = re.search(r'"comment_count"\s*:\s*(\d+)', inner_content)
+        digg_count_match = re.search(r'"digg_count"\s*:\s*(\d+)', inner_content)
+        share_count_match = re.search(r'"share_count"\s*:\s*(\d+)', inner_content)
+        collect_count_match = re.search(r'"collect_count"\s*:\s*(\d+)', inner_content)
+
+        # 构建视频信息对象
+        douyin_video_info = DouyinVideoInfo()
+        douyin_video_info.aweme_id = aweme_id_match.group(1) if aweme_id_match else None
+        douyin_video_info.comment_count = int(comment_count_match.group(1)) if comment_count_match else 0
+        douyin_video_info.digg_count = int(digg_count_match.group(1)) if digg_count_match else 0
+        douyin_video_info.share_count = int(share_count_match.group(1)) if share_count_match else 0
+        douyin_video_info.collect_count = int(collect_count_match.group(1)) if collect_count_match else 0
+        douyin_video_info.video_url = video_url
+        douyin_video_info.type = video_type
+        douyin_video_info.image_url_list = img_list
+
+        cover_match = self.COVER_REGEX.search(body.replace(r"\u002F", "/"))
+        if cover_match:
+            douyin_video_info.cover_urls = re.findall(r'"([^"]+)"', cover_match.group(1))
+        elif img_list:
+            douyin_video_info.cover_urls = img_list[:1]
+
+        if au_match:
+            douyin_video_info.nickname = au_match.group(1)
+            douyin_video_info.signature = au_match.group(2)
+
+        if ct_match:
+            timestamp = int(ct_match.group(1))
+            douyin_video_info.create_time = self.format_date(timestamp)
+
+        if desc_match:
+            douyin_video_info.desc = desc_match.group(1)
+
+        return douyin_video_info
+
+    def download_video(self, url: str, output_dir: str, progress_callback=None,
+                       video_info: Optional[DouyinVideoInfo] = None, transfer_callback=None,
+                       bandwidth: Optional[BandwidthShare] = None) -> Dict[str, Any]:
         """
         下载视频
         :param url: 抖音视频链接
         :param output_dir: 输出目录
         :param progress_callback: 进度回调函数 callback(progress, message)
+        :param transfer_callback: 字节数回调 callback(downloaded_bytes, total_bytes)，用于计算速度
+        :param video_info: 已解析的视频信息（可选，过期或缺失时重新解析）
+        :param bandwidth: 限速份额（全局限速器按任务权重分配带宽），为空时不限速
         :return: 下载结果
         """
         try:
-            # 获取视频信息
-            video_info = self.get_video_info(url)
+            # 获取视频信息（优先复用已解析的结果，避免重复请求页面）
+            if video_info is None or video_info.is_expired(video_info_cache.ttl):
+                video_info = self.get_video_info(url)
             if not video_info:
                 return {"success": False, "error": "无法获取视频信息"}
 
@@ -229,79 +558,75 @@ class PurePythonExtractor:
             # 下载视频
             if video_info.type == "video" and video_info.video_url:
                 # 生成文件名
-                title = video_info.desc or f"douyin_{video_info.aweme_id}"
-                # 清理文件名中的非法字符
-                title = re.sub(r'[\\/:*?"<>|]', '_', title)
-                title = title[:100]  # 限制长度
+                title = self._file_title(video_info)
 
                 video_filename = f"{title}_no_watermark.mp4"
                 video_path = os.path.join(output_dir, video_filename)
 
                 print(f"📥 开始下载视频: {video_filename}")
 
-                # 下载视频文件
-                response = self.session.get(video_info.video_url, stream=True, timeout=30)
-                response.raise_for_status()
-
-                total_size = int(response.headers.get('content-length', 0))
-                downloaded_size = 0
-                last_progress = 0  # 记录上次报告的进度
-
-                with open(video_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded_size += len(chunk)
-                            if total_size > 0:
-                                progress = (downloaded_size / total_size) * 100
-                                current_progress = int(progress)
-
-                                # 只在进度变化至少1%时更新（避免过于频繁）
-                                if current_progress != last_progress:
-                                    print(f"\r📊 进度: {progress:.1f}%", end="", flush=True)
-
-                                    # 调用进度回调
-                                    if progress_callback:
-                                        progress_callback(current_progress, f"下载中 {progress:.1f}%")
-
-                                    last_progress = current_progress
-
-                print(f"\n✅ 视频下载完成: {video_path}")
-
-                # 提取视频缩略图
-                thumbnail_path = self._extract_thumbnail(video_path)
-
+                # 下载视频文件（写入 .part 文件，中断后可续传）
+                last_progress = -1  # 记录上次报告的进度
+
+                def on_video_progress(downloaded_size: int, total_size: int):
+                    nonlocal last_progress
+                    if transfer_callback:
+                        transfer_callback(downloaded_size, total_size)
+                    if total_size > 0:
+                        progress = (downloaded_size / total_size) * 100
+                        current_progress = int(progress)
+
+                        # 只在进度变化至少1%时更新（避免过于频繁）
+                        if current_progress != last_progress:
+                            # 调用进度回调
+                            if progress_callback:
+                                progress_callback(current_progress, f"下载中 {progress:.1f}%")
+
+                            last_progress = current_progress
+
+                def on_retry(attempt: int, delay: float, error: Exception):
+                    if progress_callback:
+                        progress_callback(max(last_progress, 0), f"网络异常，{delay:.0f} 秒后重试 ({attempt})")
+
+                # 重试时从 .part 已写入的位置继续
+                call_with_retry(
+                    lambda: download_file(
+                        self.session, video_info.video_url, video_path, on_video_progress,
+                        timeout=get_timeout(),
+                        segments=int(get_setting("download", "segments", 1)),
+                        min_segment_size=int(get_setting("download", "min_segment_size", 1048576)),
+                        storage=StorageOptions.from_config(),
+                        bandwidth=bandwidth
+                    ),
+                    video_info.video_url, on_retry=on_retry
+                )
+
+                print(f"✅ 视频下载完成: {video_path}")
+
+                # 可选：把 moov 移到文件开头，播放器不必读完整个文件才能开始播放
+                faststart = False
+                if get_setting("download", "faststart", False):
+                    if progress_callback:
+                        progress_callback(99, "正在优化为边下边播...")
+                    faststart = make_faststart(video_path) or not needs_faststart(video_path)
+
+                # 缩略图和媒体信息由下载管理器的后处理队列提取，不占用下载槽位
                 downloaded_files.append({
                     "type": "video",
                     "path": video_path,
                     "size": os.path.getsize(video_path),
                     "is_no_watermark": True,
-                    "thumbnail": thumbnail_path  # 添加缩略图路径
+                    "faststart": faststart
                 })
 
             # 下载图片
             elif video_info.type == "img" and video_info.image_url_list:
-                title = video_info.desc or f"douyin_{video_info.aweme_id}"
-                title = re.sub(r'[\\/:*?"<>|]', '_', title)
-                title = title[:100]
-
-                for i, img_url in enumerate(video_info.image_url_list, 1):
-                    img_filename = f"{title}_{i}.jpg"
-                    img_path = os.path.join(output_dir, img_filename)
-
-                    print(f"📥 下载图片 {i}/{len(video_info.image_url_list)}: {img_filename}")
-
-                    response = self.session.get(img_url, timeout=30)
-                    response.raise_for_status()
-
-                    with open(img_path, 'wb') as f:
-                        f.write(response.content)
+                title = self._file_title(video_info)
 
-                    downloaded_files.append({
-                        "type": "image",
-                        "path": img_path,
-                        "size": os.path.getsize(img_path)
-                    })
+                downloaded_files.extend(
+                    self._download_images(video_info.image_url_list, title, output_dir,
+                                          progress_callback, transfer_callback, bandwidth)
+                )
 
                 print(f"✅ 所有图片下载完成")
 
@@ -332,8 +657,52 @@ class PurePythonExtractor:
             return {"success": False, "error": str(e)}
 
 
+def _benchmark_parse_img_list():
+    """图片列表解析的微基准：对比逐个子串扫描与索引查表"""
+    import io
+    import timeit
+    import contextlib
+
+    extractor = PurePythonExtractor()
+
+    def legacy_parse(body: str) -> List[str]:
+        content = body.replace(r"\u002F", "/")
+        first_urls = extractor.IMG_URL_REGEX.findall(content)
+        r_list = []
+        for uri in set(extractor.IMG_URI_REGEX.findall(content)):
+            t = next((item for item in first_urls if uri in item), None)
+            if t:
+                r_list.append(t)
+        return [url for url in r_list if "/obj/" not in url]
+
+    for count in (10, 50, 200, 1000):
+        images = []
+        for i in range(count):
+            uri = f"tos-cn-i-0813c001/o{i:04d}AbCdEfGhIjKlMn"
+            images.append(
+                f'{{"uri":"{uri}","url_list":['
+                f'"https:\\u002F\\u002Fp3-sign.douyinpic.com\\u002F{uri}~tplv-dy-aweme-images:q75.jpeg?x-expires=1&x-signature=abc",'
+                f'"https:\\u002F\\u002Fp9-sign.douyinpic.com\\u002F{uri}~tplv-dy-aweme-images:q75.jpeg?x-expires=1&x-signature=def"]}}'
+            )
+        body = "<html>" + "x" * 200000 + '"images":[' + ",".join(images) + "]</html>"
+        expected = [f"tos-cn-i-0813c001/o{i:04d}AbCdEfGhIjKlMn" for i in range(count)]
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = extractor.parse_img_list(body)
+            in_order = [url.split("/", 3)[3].split("~")[0] for url in result] == expected
+            new_time = min(timeit.repeat(lambda: extractor.parse_img_list(body), number=5, repeat=3)) / 5
+            old_time = min(timeit.repeat(lambda: legacy_parse(body), number=1, repeat=3))
+
+        print(f"{count:5d} 张: 索引 {new_time * 1000:8.3f} ms | 子串扫描 {old_time * 1000:8.3f} ms | "
+              f"顺序{'正确' if in_order else '错误'}")
+
+
 # 测试代码
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        _benchmark_parse_img_list()
+        sys.exit(0)
+
     extractor = PurePythonExtractor()
 
     # 测试 URL
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+重试与熔断
+网络请求失败时按指数退避（带随机抖动）重试；同一主机连续失败过多时暂时熔断
+配置读取 config.json 中的 douyin.timeout / max_retries / retry_delay
+"""
+
+import os
+import sys
+import time
+import random
+import threading
+from typing import Optional, Callable, Dict, Any, TypeVar
+from urllib.parse import urlparse
+
+import requests
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.config import get_setting
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(IOError):
+    """主机处于熔断状态，请求未发出"""
+
+    def __init__(self, message: str, retry_after: float = 0):
+        """
+        :param retry_after: 距离可以再次试探的秒数
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def get_timeout() -> float:
+    """网络请求超时（秒）"""
+    return float(get_setting("douyin", "timeout", 30))
+
+
+class RetryPolicy:
+    """指数退避重试策略"""
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 1, max_delay: float = 30, jitter: float = 0.5):
+        """
+        :param max_retries: 最多重试次数（不含首次请求）
+        :param base_delay: 首次重试前的等待时间（秒），之后每次翻倍
+        :param max_delay: 单次等待的上限（秒）
+        :param jitter: 抖动比例，实际等待时间在 [d*(1-jitter), d*(1+jitter)] 之间
+        """
+        self.max_retries = max(0, int(max_retries))
+        self.base_delay = max(0.0, float(base_delay))
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    @classmethod
+    def from_config(cls) -> "RetryPolicy":
+        """根据 config.json 创建"""
+        return cls(
+            max_retries=get_setting("douyin", "max_retries", 3),
+            base_delay=get_setting("douyin", "retry_delay", 1)
+        )
+
+    def get_delay(self, attempt: int) -> float:
+        """
+        第 attempt 次重试前的等待时间
+        :param attempt: 从 1 开始
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+class CircuitBreaker:
+    """
+    按主机熔断
+    连续失败 failure_threshold 次后进入熔断状态，reset_timeout 秒内直接拒绝请求；
+    之后放行一次试探请求，成功则恢复，失败则继续熔断
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def before_request(self, host: str) -> bool:
+        """
+        请求前检查，熔断中抛出 CircuitOpenError
+        :return: 本次请求是否为试探请求（调用方必须记录其结果）
+        """
+        with self._lock:
+            state = self._hosts.get(host)
+            if not state or state["opened_at"] is None:
+                return False
+            if state["probing"]:
+                # 试探请求进行中，结果出来前等待
+                raise CircuitOpenError(f"{host} 连续请求失败，暂停访问", self.reset_timeout)
+            remaining = self.reset_timeout - (time.time() - state["opened_at"])
+            if remaining > 0:
+                raise CircuitOpenError(f"{host} 连续请求失败，暂停访问", remaining)
+            # 熔断时间已过，放行一次试探请求
+            state["probing"] = True
+            return True
+
+    def record_success(self, host: str):
+        """请求成功"""
+        with self._lock:
+            self._hosts.pop(host, None)
+
+    def record_failure(self, host: str):
+        """请求失败"""
+        with self._lock:
+            state = self._hosts.setdefault(host, {"failures": 0, "opened_at": None, "probing": False})
+            state["failures"] += 1
+            if state["probing"] or state["failures"] >= self.failure_threshold:
+                if state["opened_at"] is None or state["probing"]:
+                    print(f"⛔ {host} 连续失败 {state['failures']} 次，暂停访问 {self.reset_timeout:.0f} 秒")
+                state["opened_at"] = time.time()
+                state["probing"] = False
+
+
+_circuit_breaker: Optional[CircuitBreaker] = None
+_circuit_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """获取进程内共享的熔断器"""
+    global _circuit_breaker
+    if _circuit_breaker is None:
+        with _circuit_breaker_lock:
+            if _circuit_breaker is None:
+                _circuit_breaker = CircuitBreaker(
+                    failure_threshold=int(get_setting("douyin", "circuit_failure_threshold", 5)),
+                    reset_timeout=float(get_setting("douyin", "circuit_reset_timeout", 30))
+                )
+    return _circuit_breaker
+
+
+def is_retryable(error: Exception) -> bool:
+    """是否为可重试的临时错误"""
+    if isinstance(error, CircuitOpenError):
+        # 等熔断结束后再试
+        return True
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else 0
+        return status == 429 or status >= 500
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)):
+        return True
+    # 传输中断（下载不完整）；带 errno 的磁盘错误重试无意义
+    return (isinstance(error, IOError) and not isinstance(error, requests.RequestException)
+            and error.errno is None)
+
+
+def call_with_retry(func: Callable[[], T], url: str, policy: Optional[RetryPolicy] = None,
+                    on_retry: Optional[Callable[[int, float, Exception], None]] = None) -> T:
+    """
+    调用 func，临时错误时按策略重试
+    断点续传的下载函数重试时会从已接收的位置继续
+    :param func: 发起请求的函数
+    :param url: 请求地址（用于按主机熔断）
+    :param policy: 重试策略，默认读取配置
+    :param on_retry: 重试前回调 callback(第几次重试, 等待秒数, 异常)
+    :return: func 的返回值
+    """
+    policy = policy or RetryPolicy.from_config()
+    breaker = get_circuit_breaker()
+    host = urlparse(url).netloc
+
+    attempt = 0
+    while True:
+        probing = False
+        recorded = False
+        try:
+            probing = breaker.before_request(host)
+            result = func()
+        except Exception as e:
+            if not is_retryable(e):
+                raise
+            if not isinstance(e, CircuitOpenError):
+                breaker.record_failure(host)
+                recorded = True
+            attempt += 1
+            if attempt > policy.max_retries:
+                raise
+            delay = policy.get_delay(attempt)
+            if isinstance(e, CircuitOpenError):
+                # 熔断中的请求没有发出，等到可以试探时再请求
+                delay = max(delay, e.retry_after)
+            print(f"⚠️ 请求失败: {e}，{delay:.1f} 秒后第 {attempt}/{policy.max_retries} 次重试")
+            if on_retry:
+                on_retry(attempt, delay, e)
+            time.sleep(delay)
+        else:
+            breaker.record_success(host)
+            recorded = True
+            return result
+        finally:
+            if probing and not recorded:
+                # 试探请求以不可重试的错误结束（如 404、磁盘错误）：重新熔断，否则一直停留在试探状态
+                breaker.record_failure(host)
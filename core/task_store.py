@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+任务状态存储
+记录每个任务的当前状态，并在状态切换时增量维护各状态的数量、已传输字节数和总传输速度，
+查询统计信息不需要遍历任务列表
+"""
+
+import threading
+from typing import Optional, Dict, Any
+
+# 任务状态
+TASK_STATUSES = ("resolving", "pending", "downloading", "success", "error")
+
+
+class TaskStore:
+    """任务状态存储（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._counts: Dict[str, int] = {status: 0 for status in TASK_STATUSES}
+        self._bytes_done = 0
+        self._rate = 0.0  # 下载中任务的速度之和（字节/秒）
+
+    def add(self, video_id: str, status: str):
+        """添加任务（已存在时只更新状态）"""
+        with self._lock:
+            if video_id not in self._tasks:
+                self._tasks[video_id] = {"status": None, "downloaded": 0, "speed": 0.0}
+            self._set_status(video_id, status)
+
+    def set_status(self, video_id: str, status: str) -> bool:
+        """
+        更新任务状态
+        :return: 任务是否存在（已删除的任务忽略）
+        """
+        with self._lock:
+            if video_id not in self._tasks:
+                return False
+            self._set_status(video_id, status)
+            return True
+
+    def _set_status(self, video_id: str, status: str):
+        """更新状态和计数（调用方持有锁）"""
+        task = self._tasks[video_id]
+        old_status = task["status"]
+        if old_status == status:
+            return
+        if old_status in self._counts:
+            self._counts[old_status] -= 1
+        if status in self._counts:
+            self._counts[status] += 1
+        task["status"] = status
+
+        if status != "downloading" and task["speed"]:
+            # 不再下载的任务不计入总速度
+            self._rate -= task["speed"]
+            task["speed"] = 0.0
+
+    def update_transfer(self, video_id: str, downloaded: int, speed: float):
+        """
+        更新任务的已传输字节数和速度
+        :param downloaded: 已传输字节数（累计值）
+        :param speed: 当前速度（字节/秒）
+        """
+        with self._lock:
+            task = self._tasks.get(video_id)
+            if task is None:
+                return
+            self._bytes_done += downloaded - task["downloaded"]
+            task["downloaded"] = downloaded
+            if task["status"] == "downloading":
+                self._rate += speed - task["speed"]
+                task["speed"] = speed
+
+    def remove(self, video_id: str):
+        """删除任务"""
+        with self._lock:
+            task = self._tasks.pop(video_id, None)
+            if task is None:
+                return
+            if task["status"] in self._counts:
+                self._counts[task["status"]] -= 1
+            self._rate -= task["speed"]
+
+    def get_status(self, video_id: str) -> Optional[str]:
+        """查询任务状态"""
+        with self._lock:
+            task = self._tasks.get(video_id)
+            return task["status"] if task else None
+
+    def count(self, status: Optional[str] = None) -> int:
+        """
+        任务数量
+        :param status: 指定状态，为空时返回全部任务数
+        """
+        with self._lock:
+            return len(self._tasks) if status is None else self._counts.get(status, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        统计信息
+        :return: {"total", "resolving", "pending", "downloading", "success", "error", "bytes_done", "rate"}
+        """
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._counts)
+            stats["total"] = len(self._tasks)
+            stats["bytes_done"] = self._bytes_done
+            stats["rate"] = max(0.0, self._rate)
+            return stats
@@ -3,78 +3,252 @@
 
 """
 视频缩略图提取工具
+ffmpeg/ffprobe 的位置在进程内只查找一次（优先使用 main.py 旁边的内置程序）；
+每个文件只启动一次 ffmpeg，同时得到时长、分辨率、编码和缩略图
 """
 
 import os
+import re
+import sys
+import json
+import shutil
+import threading
 import subprocess
+from typing import Optional, Dict, Any, Tuple
 
+# 添加父目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-def extract_thumbnail(video_path: str, output_path: str = None, time_position: str = "00:00:01") -> str:
+from core.mp4_parser import parse_mp4
+
+# 项目根目录（main.py 所在目录），内置的 ffmpeg 放在这里
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# ffmpeg 输出中的媒体信息
+DURATION_REGEX = re.compile(r'Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)')
+BITRATE_REGEX = re.compile(r'Duration:.*?bitrate:\s*(\d+)\s*kb/s')
+VIDEO_STREAM_REGEX = re.compile(r'Stream #\d+:\d+.*?: Video:\s*([^\s,]+).*?,\s*(\d{2,5})x(\d{2,5})')
+AUDIO_STREAM_REGEX = re.compile(r'Stream #\d+:\d+.*?: Audio:\s*([^\s,]+)')
+ROTATION_REGEX = re.compile(r'rotation of (-?\d+(?:\.\d+)?) degrees')
+
+_binary_cache: Dict[str, Optional[str]] = {}
+_binary_lock = threading.Lock()
+
+
+def _binary_candidates(name: str):
+    """按优先级列出可执行文件的候选路径"""
+    filename = f"{name}.exe" if os.name == "nt" else name
+    yield os.path.join(PROJECT_DIR, filename)
+    if getattr(sys, "frozen", False):
+        # 打包后的程序，内置程序在可执行文件旁边
+        yield os.path.join(os.path.dirname(sys.executable), filename)
+    found = shutil.which(name)
+    if found:
+        yield found
+
+
+def find_binary(name: str) -> Optional[str]:
     """
-    从视频中提取缩略图
+    查找 ffmpeg/ffprobe（每个进程只查找一次）
+    :param name: "ffmpeg" 或 "ffprobe"
+    :return: 可执行文件路径，不可用时返回 None
+    """
+    with _binary_lock:
+        if name in _binary_cache:
+            return _binary_cache[name]
+
+        path = None
+        for candidate in _binary_candidates(name):
+            if not os.path.isfile(candidate):
+                continue
+            try:
+                # 确认能正常运行（排除损坏或未下载完整的内置文件）
+                result = subprocess.run([candidate, "-version"], stdout=subprocess.PIPE,
+                                        stderr=subprocess.PIPE, timeout=5)
+                if result.returncode == 0:
+                    path = candidate
+                    break
+            except (OSError, subprocess.TimeoutExpired):
+                continue
+
+        _binary_cache[name] = path
+        return path
+
+
+def find_ffmpeg() -> Optional[str]:
+    """ffmpeg 路径"""
+    return find_binary("ffmpeg")
+
+
+def find_ffprobe() -> Optional[str]:
+    """ffprobe 路径"""
+    return find_binary("ffprobe")
+
+
+class MediaInfo:
+    """媒体文件信息"""
+
+    def __init__(self):
+        self.duration: float = 0  # 秒
+        self.width: int = 0
+        self.height: int = 0
+        self.video_codec: Optional[str] = None
+        self.audio_codec: Optional[str] = None
+        self.bitrate: int = 0  # 比特/秒
+        self.thumbnail: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "duration": self.duration,
+            "width": self.width,
+            "height": self.height,
+            "video_codec": self.video_codec,
+            "audio_codec": self.audio_codec,
+            "bitrate": self.bitrate,
+            "thumbnail": self.thumbnail,
+        }
+
+
+def parse_ffmpeg_output(output: str) -> MediaInfo:
+    """
+    解析 ffmpeg 输出的输入文件信息
+    :param output: ffmpeg 的标准错误输出
+    """
+    info = MediaInfo()
+    # 只看输入部分，输出文件的流信息在 "Output #0" 之后
+    output = output.split("Output #0", 1)[0]
+
+    match = DURATION_REGEX.search(output)
+    if match:
+        hours, minutes, seconds = match.groups()
+        info.duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    match = BITRATE_REGEX.search(output)
+    if match:
+        info.bitrate = int(match.group(1)) * 1000
+
+    match = VIDEO_STREAM_REGEX.search(output)
+    if match:
+        info.video_codec = match.group(1)
+        info.width, info.height = int(match.group(2)), int(match.group(3))
+        rotation = ROTATION_REGEX.search(output)
+        if rotation and abs(float(rotation.group(1))) % 180 == 90:
+            # 竖屏视频以旋转元数据存储
+            info.width, info.height = info.height, info.width
+
+    match = AUDIO_STREAM_REGEX.search(output)
+    if match:
+        info.audio_codec = match.group(1)
+
+    return info
+
+
+def _probe_with_ffprobe(ffprobe: str, video_path: str) -> MediaInfo:
+    """没有 ffmpeg 时用 ffprobe 读取媒体信息（不生成缩略图）"""
+    info = MediaInfo()
+    result = subprocess.run(
+        [ffprobe, "-v", "error", "-show_format", "-show_streams", "-of", "json", video_path],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        timeout=10
+    )
+    if result.returncode != 0:
+        return info
+
+    data = json.loads(result.stdout.decode('utf-8') or "{}")
+    media_format = data.get("format", {})
+    info.duration = float(media_format.get("duration") or 0)
+    info.bitrate = int(media_format.get("bit_rate") or 0)
+    for stream in data.get("streams", []):
+        if stream.get("codec_type") == "video" and not info.video_codec:
+            info.video_codec = stream.get("codec_name")
+            info.width, info.height = int(stream.get("width") or 0), int(stream.get("height") or 0)
+        elif stream.get("codec_type") == "audio" and not info.audio_codec:
+            info.audio_codec = stream.get("codec_name")
+    return info
+
+
+def probe_media(video_path: str, thumbnail_path: Optional[str] = None,
+                time_position: str = "00:00:01") -> MediaInfo:
+    """
+    读取媒体信息，可同时提取缩略图（只启动一次 ffmpeg）
+    不需要缩略图时优先用 mp4_parser 解析，MP4 文件不启动任何进程
 
     :param video_path: 视频文件路径
-    :param output_path: 输出图片路径（可选，默认为视频同目录）
+    :param thumbnail_path: 缩略图输出路径，为空时不提取
     :param time_position: 提取帧的时间位置，默认第1秒
-    :return: 缩略图路径，失败返回 None
+    :return: 媒体信息，失败时各字段为空
     """
+    if not thumbnail_path:
+        # 只需要媒体信息时先直接解析 MP4 盒子，不启动进程
+        mp4 = parse_mp4(video_path)
+        if mp4 and mp4.duration > 0:
+            info = MediaInfo()
+            info.duration, info.width, info.height = mp4.duration, mp4.width, mp4.height
+            info.video_codec, info.audio_codec, info.bitrate = mp4.video_codec, mp4.audio_codec, mp4.bitrate
+            return info
+
+    ffmpeg = find_ffmpeg()
     try:
-        # 生成输出路径
-        if not output_path:
-            video_dir = os.path.dirname(video_path)
-            video_name = os.path.splitext(os.path.basename(video_path))[0]
-            output_path = os.path.join(video_dir, f"{video_name}_thumb.jpg")
+        if not ffmpeg:
+            ffprobe = find_ffprobe()
+            if ffprobe:
+                return _probe_with_ffprobe(ffprobe, video_path)
+            print("⚠️ ffmpeg 未安装或不可用，无法读取媒体信息")
+            return MediaInfo()
 
-        # 检查 ffmpeg 是否可用
-        try:
-            subprocess.run(
-                ["ffmpeg", "-version"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                timeout=5
-            )
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            print("⚠️ ffmpeg 未安装或不可用，无法提取缩略图")
-            return None
-
-        # 使用 ffmpeg 提取缩略图
+        # 不指定输出时 ffmpeg 只打印输入文件信息
         # -ss: 指定时间位置
-        # -i: 输入文件
-        # -vframes 1: 只提取一帧
+        # -frames:v 1: 只提取一帧
+        # -vf scale=120:68: 缩放到列表缩略图大小
         # -q:v 2: 质量（1-31，越小质量越好）
-        # -vf scale=120:68: 缩放到指定大小
-        cmd = [
-            "ffmpeg",
-            "-ss", time_position,
-            "-i", video_path,
-            "-vframes", "1",
-            "-vf", "scale=120:68",
-            "-q:v", "2",
-            "-y",  # 覆盖已存在的文件
-            output_path
-        ]
-
-        print(f"📸 正在提取缩略图...")
-
-        # 执行命令
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=10
-        )
-
-        # 检查是否成功
-        if result.returncode == 0 and os.path.exists(output_path):
-            print(f"✅ 缩略图提取成功: {output_path}")
-            return output_path
+        cmd = [ffmpeg, "-hide_banner", "-nostdin"]
+        if thumbnail_path:
+            cmd += ["-ss", time_position, "-i", video_path,
+                    "-frames:v", "1", "-vf", "scale=120:68", "-q:v", "2", "-y", thumbnail_path]
         else:
-            print(f"⚠️ 缩略图提取失败")
-            return None
+            cmd += ["-i", video_path]
+
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=10)
+        info = parse_ffmpeg_output(result.stderr.decode('utf-8', errors='replace'))
+
+        if thumbnail_path:
+            if result.returncode == 0 and os.path.exists(thumbnail_path) and os.path.getsize(thumbnail_path) > 0:
+                info.thumbnail = thumbnail_path
+                print(f"✅ 缩略图提取成功: {thumbnail_path}")
+            elif info.width and time_position != "00:00:00":
+                # 视频短于指定位置时取第一帧
+                info.thumbnail = probe_media(video_path, thumbnail_path, "00:00:00").thumbnail
+            else:
+                print(f"⚠️ 缩略图提取失败")
+        return info
 
     except Exception as e:
-        print(f"❌ 提取缩略图异常: {e}")
-        return None
+        print(f"⚠️ 读取媒体信息失败: {e}")
+        return MediaInfo()
+
+
+def get_thumbnail_path(video_path: str) -> str:
+    """视频对应的缩略图路径（与视频同目录）"""
+    video_dir = os.path.dirname(video_path)
+    video_name = os.path.splitext(os.path.basename(video_path))[0]
+    return os.path.join(video_dir, f"{video_name}_thumb.jpg")
+
+
+def extract_thumbnail(video_path: str, output_path: str = None, time_position: str = "00:00:01") -> str:
+    """
+    从视频中提取缩略图
+
+    :param video_path: 视频文件路径
+    :param output_path: 输出图片路径（可选，默认为视频同目录）
+    :param time_position: 提取帧的时间位置，默认第1秒
+    :return: 缩略图路径，失败返回 None
+    """
+    if not output_path:
+        output_path = get_thumbnail_path(video_path)
+
+    print(f"📸 正在提取缩略图...")
+    return probe_media(video_path, output_path, time_position).thumbnail
 
 
 def get_video_duration(video_path: str) -> float:
@@ -84,34 +258,29 @@ def get_video_duration(video_path: str) -> float:
     :param video_path: 视频文件路径
     :return: 视频时长（秒），失败返回 0
     """
-    try:
-        # 使用 ffprobe 获取视频时长
-        cmd = [
-            "ffprobe",
-            "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            video_path
-        ]
-
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=10
-        )
-
-        if result.returncode == 0:
-            duration_str = result.stdout.decode('utf-8').strip()
-            try:
-                duration = float(duration_str)
-                return duration
-            except ValueError:
-                return 0
-        return 0
-    except Exception as e:
-        print(f"⚠️ 获取视频时长失败: {e}")
-        return 0
+    return probe_media(video_path).duration
+
+
+def get_video_resolution(video_path: str) -> Tuple[int, int]:
+    """
+    获取视频分辨率
+
+    :param video_path: 视频文件路径
+    :return: (宽, 高)，失败返回 (0, 0)
+    """
+    info = probe_media(video_path)
+    return info.width, info.height
+
+
+def format_resolution(width: int, height: int) -> str:
+    """
+    格式化分辨率，按短边显示（如 1080p），竖屏视频同样适用
+
+    :return: 格式化后的分辨率字符串
+    """
+    if width <= 0 or height <= 0:
+        return "未知"
+    return f"{min(width, height)}p"
 
 
 def format_duration(seconds: float) -> str:
@@ -141,22 +310,74 @@ def check_ffmpeg_available() -> bool:
 
     :return: True 如果可用，否则 False
     """
-    try:
-        result = subprocess.run(
-            ["ffmpeg", "-version"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=5
-        )
-        return result.returncode == 0
-    except:
-        return False
+    return find_ffmpeg() is not None
+
+
+def _benchmark_process_spawns(count: int = 10):
+    """对比原流程（ffmpeg -version + 提取缩略图 + ffprobe）与 probe_media 的进程启动次数和耗时"""
+    import time
+    import tempfile
+
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        print("❌ ffmpeg 不可用，无法运行基准测试")
+        return
+
+    spawns = [0]
+    original_run = subprocess.run
+
+    def counting_run(*args, **kwargs):
+        spawns[0] += 1
+        return original_run(*args, **kwargs)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 生成测试视频（竖屏 5 秒，带音频）
+        sample = os.path.join(tmp_dir, "sample.mp4")
+        original_run([ffmpeg, "-v", "error", "-f", "lavfi", "-i", "testsrc=size=360x640:rate=30:duration=5",
+                      "-f", "lavfi", "-i", "sine=duration=5", "-c:v", "libx264", "-c:a", "aac",
+                      "-shortest", "-y", sample], timeout=60)
+        videos = []
+        for i in range(count):
+            path = os.path.join(tmp_dir, f"video_{i}.mp4")
+            shutil.copyfile(sample, path)
+            videos.append(path)
+
+        def legacy(path: str):
+            # 原实现：每个文件依次启动三个进程
+            subprocess.run(["ffmpeg", "-version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=5)
+            subprocess.run([ffmpeg, "-ss", "00:00:01", "-i", path, "-vframes", "1", "-vf", "scale=120:68",
+                            "-q:v", "2", "-y", path + "_legacy.jpg"],
+                           stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=10)
+            try:
+                subprocess.run(["ffprobe", "-v", "error", "-show_entries", "format=duration",
+                                "-of", "default=noprint_wrappers=1:nokey=1", path],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=10)
+            except FileNotFoundError:
+                pass
+
+        subprocess.run = counting_run
+        try:
+            for name, func in (("原流程", legacy),
+                               ("probe_media", lambda path: probe_media(path, path + "_thumb.jpg"))):
+                spawns[0] = 0
+                began = time.perf_counter()
+                for path in videos:
+                    func(path)
+                elapsed = time.perf_counter() - began
+                print(f"{name}: {count} 个文件启动 {spawns[0]} 次进程，耗时 {elapsed:.2f}s")
+        finally:
+            subprocess.run = original_run
+
+        info = probe_media(videos[0])
+        print(f"媒体信息: {info.to_dict()}")
 
 
 if __name__ == "__main__":
     # 测试
     print("检查 ffmpeg 是否可用:")
     if check_ffmpeg_available():
-        print("✅ ffmpeg 可用")
+        print(f"✅ ffmpeg 可用: {find_ffmpeg()}")
+        if len(sys.argv) > 1 and sys.argv[1] == "bench":
+            _benchmark_process_spawns()
     else:
         print("❌ ffmpeg 不可用")
@@ -0,0 +1,557 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+文件传输 - 支持断点续传的流式下载
+数据先写入 .part 文件，完成后原子重命名为最终文件名
+大文件可按字节范围分段并发下载，写入方式（预分配、写缓冲、刷盘策略）见 core/storage.py
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import socket
+import threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from typing import Optional, Dict, Any, Callable, List, Tuple
+
+import requests
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.storage import StorageOptions
+from core.bandwidth import BandwidthShare
+
+# 临时文件后缀
+PART_SUFFIX = ".part"
+STATE_SUFFIX = ".part.json"
+
+CONTENT_RANGE_REGEX = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)')
+
+# 每接收这么多字节刷新一次续传状态（分段下载时按分段计）
+STATE_SAVE_INTERVAL = 1024 * 1024
+
+# 接收缓冲区：单次读取的大小在上下限之间随吞吐量调整，使每次读取耗时接近目标值
+MIN_READ_SIZE = 64 * 1024
+MAX_READ_SIZE = 4 * 1024 * 1024
+TARGET_READ_TIME = 0.1
+
+# 同一目标文件同时只允许一个传输写入 .part
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+
+def _get_path_lock(path: str) -> threading.Lock:
+    """获取目标文件对应的锁"""
+    key = os.path.abspath(path)
+    with _path_locks_guard:
+        lock = _path_locks.get(key)
+        if lock is None:
+            lock = _path_locks[key] = threading.Lock()
+        return lock
+
+
+def _load_state(state_path: str) -> Optional[Dict[str, Any]]:
+    """读取续传状态"""
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_state(state_path: str, state: Dict[str, Any]):
+    """保存续传状态"""
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+
+def _remove(path: str):
+    """删除文件（不存在时忽略）"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _get_readinto(response: requests.Response) -> Optional[Callable[[memoryview], int]]:
+    """
+    获取直接读入缓冲区的函数
+    响应未压缩时跳过 urllib3 的解码层，由 http.client 从套接字直接写入缓冲区；
+    否则返回 None，改用 iter_content
+    """
+    if response.headers.get("content-encoding", "identity").lower() != "identity":
+        return None
+    fp = getattr(response.raw, "_fp", None)
+    return getattr(fp, "readinto", None)
+
+
+def _receive(response: requests.Response, f, on_data: Callable[[int], None],
+             chunk_size: int = MIN_READ_SIZE, abort: Optional[threading.Event] = None,
+             bandwidth: Optional[BandwidthShare] = None) -> bool:
+    """
+    将响应体写入已打开的文件
+    使用一块复用的缓冲区接收数据，不为每个数据块分配新对象；读取大小随吞吐量自适应调整
+    :param f: 已定位的写入器（StorageWriter）或以二进制写方式打开的文件
+    :param on_data: 每次写入后的回调 callback(本次字节数)
+    :param chunk_size: 初始读取大小
+    :param abort: 设置后尽快停止
+    :param bandwidth: 限速份额，每次读取后按字节数等待令牌
+    :return: 是否被 abort 中止
+    """
+    readinto = _get_readinto(response)
+    if readinto is None:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if abort is not None and abort.is_set():
+                return True
+            if chunk:
+                f.write(chunk)
+                on_data(len(chunk))
+                if bandwidth is not None:
+                    bandwidth.consume(len(chunk))
+        return False
+
+    read_size = max(MIN_READ_SIZE, min(chunk_size, MAX_READ_SIZE))
+    buffer = memoryview(bytearray(MAX_READ_SIZE))
+    while True:
+        if abort is not None and abort.is_set():
+            return True
+        limit = read_size
+        if bandwidth is not None:
+            # 限速时减小单次读取量，令牌按小块发放，各任务交替更均匀
+            limit = min(read_size, bandwidth.read_limit() or read_size)
+        began = time.perf_counter()
+        try:
+            n = readinto(buffer[:limit])
+        except socket.timeout as e:
+            raise requests.exceptions.ConnectionError(e)
+        except (http.client.HTTPException, OSError) as e:
+            # 与 iter_content 一致，连接中断视为可重试的传输错误
+            raise requests.exceptions.ChunkedEncodingError(e)
+        if not n:
+            break
+        f.write(buffer[:n])
+        on_data(n)
+        if bandwidth is not None:
+            bandwidth.consume(n)
+
+        # 读满且很快完成时加大读取量，耗时过长时减小，避免进度长时间不更新
+        elapsed = time.perf_counter() - began
+        if n == limit and elapsed < TARGET_READ_TIME / 2 and read_size < MAX_READ_SIZE:
+            read_size *= 2
+        elif elapsed > TARGET_READ_TIME * 2 and read_size > MIN_READ_SIZE:
+            read_size //= 2
+
+    if response.raw._fp.isclosed():
+        # 响应体已读完，连接归还连接池以便复用
+        response._content_consumed = True
+        response.raw.release_conn()
+    return False
+
+
+def download_file(session: requests.Session, url: str, dest_path: str,
+                  progress_callback: Optional[Callable[[int, int], None]] = None,
+                  timeout: float = 30, chunk_size: int = 8192,
+                  segments: int = 1, min_segment_size: int = 1024 * 1024,
+                  storage: Optional[StorageOptions] = None,
+                  bandwidth: Optional[BandwidthShare] = None) -> int:
+    """
+    断点续传下载文件
+
+    .part.json 记录总大小、ETag/Last-Modified 和已写入的字节数（.part 预分配后文件大小不再等于已接收量），
+    续传时通过 Range + If-Range 请求剩余部分，服务器内容变化时自动从头下载。
+
+    :param session: 请求会话
+    :param url: 文件地址
+    :param dest_path: 最终文件路径
+    :param progress_callback: 进度回调 callback(downloaded_bytes, total_bytes)，总大小未知时为 0
+    :param timeout: 请求超时（秒）
+    :param chunk_size: 初始读取块大小（之后随吞吐量自适应调整）
+    :param segments: 分段数，大于 1 时按字节范围并发下载（服务器不支持 Range 时退回单连接）
+    :param min_segment_size: 每个分段的最小字节数，文件较小时自动减少分段
+    :param storage: 写入选项，为空时使用默认值
+    :param bandwidth: 限速份额（core/bandwidth.py），为空时不限速
+    :return: 文件总字节数
+    """
+    storage = storage or StorageOptions()
+    with _get_path_lock(dest_path):
+        state = _load_state(dest_path + STATE_SUFFIX)
+        if state and state.get("segments"):
+            # 上次是分段下载，按分段继续
+            return _download_segmented(session, url, dest_path, progress_callback, timeout,
+                                       chunk_size, len(state["segments"]), min_segment_size, state, storage,
+                                       bandwidth)
+        if segments > 1 and not state:
+            return _download_segmented(session, url, dest_path, progress_callback, timeout,
+                                       chunk_size, segments, min_segment_size, None, storage, bandwidth)
+        return _download_file(session, url, dest_path, progress_callback, timeout, chunk_size, storage,
+                              bandwidth)
+
+
+def _download_file(session: requests.Session, url: str, dest_path: str,
+                   progress_callback: Optional[Callable[[int, int], None]],
+                   timeout: float, chunk_size: int, storage: StorageOptions,
+                   bandwidth: Optional[BandwidthShare] = None) -> int:
+    """断点续传下载的实现（调用方持有目标文件锁）"""
+    part_path = dest_path + PART_SUFFIX
+    state_path = dest_path + STATE_SUFFIX
+
+    state = _load_state(state_path)
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if state and "received" in state:
+        # 预分配过的 .part 大小是总大小，以记录的已写入字节数为准
+        offset = min(offset, state["received"])
+    if not state or offset > state.get("total_size", 0) > 0:
+        # 没有续传状态或状态不一致，从头下载
+        state = None
+        offset = 0
+
+    # 要求不压缩传输，保证字节偏移与文件内容一致
+    headers = {"Accept-Encoding": "identity"}
+    if offset > 0:
+        headers["Range"] = f"bytes={offset}-"
+        validator = state.get("etag") or state.get("last_modified")
+        if validator:
+            headers["If-Range"] = validator
+
+    response = session.get(url, stream=True, timeout=timeout, headers=headers)
+    try:
+        if response.status_code == 416 and state and offset == state.get("total_size"):
+            # 上次已接收完整，只差重命名
+            os.replace(part_path, dest_path)
+            _remove(state_path)
+            return offset
+
+        response.raise_for_status()
+
+        total_size = 0
+        if response.status_code == 206 and offset > 0:
+            match = CONTENT_RANGE_REGEX.match(response.headers.get("content-range", ""))
+            range_total = int(match.group(3)) if match and match.group(3) != "*" else 0
+            if (not match or int(match.group(1)) != offset
+                    or (state.get("total_size") and range_total != state["total_size"])):
+                # 续传范围不匹配，丢弃已下载部分重新开始
+                print("⚠️ 续传校验失败，重新下载")
+                response.close()
+                _remove(part_path)
+                _remove(state_path)
+                return _download_file(session, url, dest_path, progress_callback, timeout, chunk_size, storage,
+                                      bandwidth)
+            total_size = range_total
+            print(f"🔁 从 {offset} 字节处继续下载")
+        else:
+            # 服务器忽略 Range 或内容已变化，从头下载
+            offset = 0
+            total_size = int(response.headers.get("content-length", 0))
+
+        state = {
+            "url": url,
+            "total_size": total_size,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "received": offset
+        }
+        _save_state(state_path, state)
+
+        downloaded = offset
+        unsaved = 0
+        f = storage.open(part_path, offset, total_size, truncate=offset == 0)
+
+        def on_data(n: int):
+            nonlocal downloaded, unsaved
+            downloaded += n
+            unsaved += n
+            if progress_callback:
+                progress_callback(downloaded, total_size)
+
+            if unsaved >= STATE_SAVE_INTERVAL:
+                # 先写出再记录偏移，保证状态不超前于文件内容
+                f.checkpoint()
+                state["received"] = downloaded
+                _save_state(state_path, state)
+                unsaved = 0
+
+        try:
+            _receive(response, f, on_data, chunk_size, bandwidth=bandwidth)
+        finally:
+            # 关闭失败（如磁盘已满）时保留上一次记录的偏移
+            f.close()
+            state["received"] = downloaded
+            _save_state(state_path, state)
+    finally:
+        response.close()
+
+    if total_size and downloaded != total_size:
+        # 保留 .part 文件，下次可以继续
+        raise IOError(f"下载不完整: {downloaded}/{total_size} 字节")
+
+    os.replace(part_path, dest_path)
+    _remove(state_path)
+    return downloaded
+
+
+def probe_range_support(session: requests.Session, url: str,
+                        timeout: float = 30) -> Optional[Tuple[int, Optional[str], Optional[str]]]:
+    """
+    探测服务器是否支持 Range 请求
+    :return: (总字节数, ETag, Last-Modified)，不支持时返回 None
+    """
+    headers = {"Accept-Encoding": "identity", "Range": "bytes=0-0"}
+    response = session.get(url, stream=True, timeout=timeout, headers=headers)
+    try:
+        response.raise_for_status()
+        if response.status_code != 206:
+            return None
+        match = CONTENT_RANGE_REGEX.match(response.headers.get("content-range", ""))
+        if not match or match.group(3) == "*":
+            return None
+        return int(match.group(3)), response.headers.get("etag"), response.headers.get("last-modified")
+    finally:
+        response.close()
+
+
+def split_ranges(total_size: int, segments: int) -> List[List[int]]:
+    """
+    将文件切分为字节范围
+    :return: [[起始偏移, 结束偏移(含), 已接收字节数], ...]
+    """
+    segment_size = -(-total_size // segments)
+    return [[start, min(start + segment_size, total_size) - 1, 0]
+            for start in range(0, total_size, segment_size)]
+
+
+def _download_segmented(session: requests.Session, url: str, dest_path: str,
+                        progress_callback: Optional[Callable[[int, int], None]],
+                        timeout: float, chunk_size: int, segments: int,
+                        min_segment_size: int, state: Optional[Dict[str, Any]],
+                        storage: StorageOptions, bandwidth: Optional[BandwidthShare] = None) -> int:
+    """
+    分段并发下载（调用方持有目标文件锁）
+    .part 文件预分配为完整大小，各分段用自己的写入器按偏移写入自己的区间；
+    .part.json 记录每个分段已写入的字节数，用于续传
+    """
+    part_path = dest_path + PART_SUFFIX
+    state_path = dest_path + STATE_SUFFIX
+
+    probe = probe_range_support(session, url, timeout)
+    if not probe:
+        print("ℹ️ 服务器不支持分段下载，使用单连接下载")
+        _remove(part_path)
+        _remove(state_path)
+        return _download_file(session, url, dest_path, progress_callback, timeout, chunk_size, storage,
+                              bandwidth)
+
+    total_size, etag, last_modified = probe
+    if state and (state.get("total_size") != total_size
+                  or (state.get("etag") and etag and state["etag"] != etag)
+                  or not os.path.exists(part_path)):
+        # 服务器上的文件已变化，重新开始
+        print("⚠️ 续传校验失败，重新下载")
+        state = None
+
+    if state is None:
+        segments = max(1, min(segments, total_size // max(1, min_segment_size)))
+        if segments == 1:
+            return _download_file(session, url, dest_path, progress_callback, timeout, chunk_size, storage,
+                                  bandwidth)
+
+        # 预分配完整文件
+        storage.open(part_path, 0, total_size, truncate=True).close()
+        state = {
+            "url": url,
+            "total_size": total_size,
+            "etag": etag,
+            "last_modified": last_modified,
+            "segments": split_ranges(total_size, segments)
+        }
+        _save_state(state_path, state)
+    else:
+        print(f"🔁 继续分段下载 ({len(state['segments'])} 段)")
+
+    ranges = state["segments"]
+    lock = threading.Lock()
+    abort = threading.Event()
+    downloaded = [sum(seg[2] for seg in ranges)]
+
+    def fetch_segment(seg: List[int]):
+        start, end, received = seg
+        if start + received > end:
+            return
+
+        headers = {"Accept-Encoding": "identity", "Range": f"bytes={start + received}-{end}"}
+        response = session.get(url, stream=True, timeout=timeout, headers=headers)
+        try:
+            response.raise_for_status()
+            match = CONTENT_RANGE_REGEX.match(response.headers.get("content-range", ""))
+            if response.status_code != 206 or not match or int(match.group(1)) != start + received:
+                raise IOError("服务器返回的分段范围不匹配")
+
+            unsaved = 0
+            with storage.open(part_path, start + received) as f:
+
+                def on_data(n: int):
+                    nonlocal unsaved
+                    unsaved += n
+                    with lock:
+                        downloaded[0] += n
+                        if progress_callback:
+                            progress_callback(downloaded[0], total_size)
+
+                    if unsaved >= STATE_SAVE_INTERVAL:
+                        # 先写出再记录偏移，保证状态不超前于文件内容
+                        f.checkpoint()
+                        with lock:
+                            seg[2] += unsaved
+                            _save_state(state_path, state)
+                        unsaved = 0
+
+                if _receive(response, f, on_data, chunk_size, abort, bandwidth):
+                    return
+                f.checkpoint()
+                with lock:
+                    seg[2] += unsaved
+        finally:
+            response.close()
+
+    with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = [executor.submit(fetch_segment, seg) for seg in ranges]
+        wait(futures, return_when=FIRST_EXCEPTION)
+        errors = [future.exception() for future in futures if future.done() and future.exception()]
+        if errors:
+            # 一个分段失败时通知其余分段尽快停止
+            abort.set()
+        wait(futures)
+
+    _save_state(state_path, state)
+    if errors:
+        # 保留 .part 文件和分段状态，下次可以继续
+        raise errors[0]
+
+    received = sum(seg[2] for seg in ranges)
+    if received != total_size:
+        raise IOError(f"下载不完整: {received}/{total_size} 字节")
+
+    os.replace(part_path, dest_path)
+    _remove(state_path)
+    return total_size
+
+
+# 测试代码：
+#   python core/transfer.py segments  与本地限速服务器对比不同分段数的吞吐量
+#   python core/transfer.py receive   对比逐块 iter_content 与复用缓冲区接收的 CPU 开销
+if __name__ == "__main__":
+    import tempfile
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+    from socketserver import ThreadingMixIn
+
+    from core.http_client import get_session
+
+    FILE_SIZE = 32 * 1024 * 1024
+    PER_CONNECTION_RATE = 4 * 1024 * 1024  # 每个连接限速 4 MB/s，模拟单连接受限的 CDN
+    payload = os.urandom(FILE_SIZE)
+    connections = set()
+
+    class RangeHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            connections.add(self.client_address)
+            start, end = 0, FILE_SIZE - 1
+            match = re.match(r'bytes=(\d+)-(\d*)', self.headers.get("Range", ""))
+            if match:
+                start = int(match.group(1))
+                end = int(match.group(2)) if match.group(2) else FILE_SIZE - 1
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{FILE_SIZE}")
+            else:
+                self.send_response(200)
+            self.send_header("Content-Length", str(end - start + 1))
+            self.send_header("ETag", '"bench"')
+            self.end_headers()
+
+            # /raw 不限速，用于测量客户端 CPU 开销
+            throttled = not self.path.startswith("/raw")
+            block = 256 * 1024 if not throttled else 64 * 1024
+            began = time.perf_counter()
+            sent = 0
+            for offset in range(start, end + 1, block):
+                data = payload[offset:min(offset + block, end + 1)]
+                self.wfile.write(data)
+                sent += len(data)
+                if throttled:
+                    delay = sent / PER_CONNECTION_RATE - (time.perf_counter() - began)
+                    if delay > 0:
+                        time.sleep(delay)
+
+    class BenchServer(ThreadingMixIn, HTTPServer):
+        daemon_threads = True
+
+    server = BenchServer(("127.0.0.1", 0), RangeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    mode = sys.argv[1] if len(sys.argv) > 1 else "all"
+
+    def verify(path: str) -> bool:
+        with open(path, 'rb') as f:
+            return f.read() == payload
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if mode in ("all", "segments"):
+            print("=" * 60)
+            print(f"分段下载基准测试: {FILE_SIZE // (1024 * 1024)} MB，单连接限速 {PER_CONNECTION_RATE // (1024 * 1024)} MB/s")
+            print("=" * 60)
+            for segment_count in (1, 2, 4, 8):
+                target = os.path.join(tmp_dir, f"bench_{segment_count}.mp4")
+                began = time.perf_counter()
+                download_file(get_session(), f"{base_url}/video.mp4", target,
+                              segments=segment_count, chunk_size=64 * 1024)
+                elapsed = time.perf_counter() - began
+                print(f"分段数 {segment_count}: {elapsed:.2f}s, {FILE_SIZE / elapsed / 1024 / 1024:.1f} MB/s, "
+                      f"校验{'通过' if verify(target) else '失败'}")
+
+        if mode in ("all", "receive"):
+            ROUNDS = 8
+            raw_url = f"{base_url}/raw/video.mp4"
+
+            def legacy_download(target: str):
+                # 原实现：每 8 KiB 分配一个新 bytes 并回调一次进度
+                response = get_session().get(raw_url, stream=True, headers={"Accept-Encoding": "identity"})
+                downloaded = 0
+                with open(target, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        if chunk:
+                            f.write(chunk)
+                            downloaded += len(chunk)
+                response.close()
+
+            def current_download(target: str):
+                download_file(get_session(), raw_url, target, lambda done, total: None)
+
+            print("=" * 60)
+            print(f"接收路径 CPU 开销: {FILE_SIZE // (1024 * 1024)} MB x {ROUNDS} 次，本地不限速")
+            print("=" * 60)
+            for name, func in (("iter_content 8 KiB", legacy_download), ("复用缓冲区 readinto", current_download)):
+                target = os.path.join(tmp_dir, "receive.mp4")
+                connections.clear()
+                cpu = 0.0
+                began = time.perf_counter()
+                for _ in range(ROUNDS):
+                    # 只统计下载线程的 CPU 时间，不含同进程内的服务器线程
+                    cpu_began = time.thread_time()
+                    func(target)
+                    cpu += time.thread_time() - cpu_began
+                elapsed = time.perf_counter() - began
+                gigabytes = FILE_SIZE * ROUNDS / 1024 ** 3
+                print(f"{name}: CPU {cpu / gigabytes:.2f}s/GB, {FILE_SIZE * ROUNDS / elapsed / 1024 / 1024:.0f} MB/s, "
+                      f"连接数 {len(connections)}, 校验{'通过' if verify(target) else '失败'}")
+
+    server.shutdown()
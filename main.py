@@ -17,6 +17,7 @@ from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QIcon
 from ui.main_window import MainWindow
+from core.http_client import close_session
 
 
 def setup_app():
@@ -64,7 +65,11 @@ def main():
     window.show()
 
     # 运行应用
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+
+    # 释放共享连接池
+    close_session()
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
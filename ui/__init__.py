@@ -13,14 +13,21 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from ui.sidebar import Sidebar
 from ui.topbar import TopBar
-from ui.video_list import VideoList, VideoCard, EmptyState
+from ui.video_list import VideoList, VideoListModel, VideoItemDelegate, EmptyState
+from ui.history_dialog import HistoryDialog
+from ui.notification import NotificationToast
+from ui.thumbnail_cache import ThumbnailCache
 from ui.main_window import MainWindow
 
 __all__ = [
     'Sidebar',
     'TopBar',
     'VideoList',
-    'VideoCard',
+    'VideoListModel',
+    'VideoItemDelegate',
     'EmptyState',
+    'HistoryDialog',
+    'NotificationToast',
+    'ThumbnailCache',
     'MainWindow'
 ]
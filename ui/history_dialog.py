@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+下载历史对话框
+"""
+
+import os
+import sys
+from datetime import datetime
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+                            QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView,
+                            QMessageBox)
+from PyQt5.QtCore import Qt, QSize, pyqtSignal
+from ui.styles import DIALOG_STYLE
+from core.history import get_history
+
+
+class HistoryDialog(QDialog):
+    """下载历史对话框"""
+
+    # 定义信号
+    open_folder_clicked = pyqtSignal(str)  # 打开文件所在目录
+
+    # 一次最多显示的记录数
+    MAX_ENTRIES = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.entries = []
+        self.init_ui()
+        self.load_entries()
+
+    def init_ui(self):
+        """初始化UI"""
+        self.setWindowTitle("下载历史")
+        self.setMinimumSize(QSize(900, 500))
+        self.setStyleSheet(DIALOG_STYLE)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(12)
+
+        # 统计
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        # 历史表格
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["标题", "类型", "大小", "下载时间", "文件位置"])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.Stretch)
+        header.setSectionResizeMode(4, QHeaderView.Stretch)
+        self.table.doubleClicked.connect(self.on_open_folder_clicked)
+        layout.addWidget(self.table)
+
+        # 按钮
+        buttons_layout = QHBoxLayout()
+        buttons_layout.addStretch()
+
+        open_btn = QPushButton("📁 打开文件夹")
+        open_btn.setCursor(Qt.PointingHandCursor)
+        open_btn.clicked.connect(self.on_open_folder_clicked)
+        buttons_layout.addWidget(open_btn)
+
+        delete_btn = QPushButton("🗑️ 删除记录")
+        delete_btn.setObjectName("cancelButton")
+        delete_btn.setCursor(Qt.PointingHandCursor)
+        delete_btn.clicked.connect(self.on_delete_clicked)
+        buttons_layout.addWidget(delete_btn)
+
+        close_btn = QPushButton("关闭")
+        close_btn.setObjectName("cancelButton")
+        close_btn.setCursor(Qt.PointingHandCursor)
+        close_btn.clicked.connect(self.accept)
+        buttons_layout.addWidget(close_btn)
+
+        layout.addLayout(buttons_layout)
+
+    def load_entries(self):
+        """加载历史记录"""
+        history = get_history()
+        self.entries = history.list_entries(limit=self.MAX_ENTRIES)
+
+        self.table.setRowCount(len(self.entries))
+        for row, entry in enumerate(self.entries):
+            media_files = [f for f in entry["files"] if f.get("type") in ("video", "image")]
+            first_path = media_files[0]["path"] if media_files else ""
+            values = [
+                entry.get("title") or "抖音视频",
+                "视频" if entry.get("type") == "video" else f"图片集 ({len(media_files)} 张)",
+                self._format_size(entry.get("total_size") or 0),
+                datetime.fromtimestamp(entry["updated_at"]).strftime("%Y-%m-%d %H:%M"),
+                first_path
+            ]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+
+        total = history.count()
+        self.summary_label.setText(f"共 {total} 条下载记录" +
+                                   (f"（显示最近 {self.MAX_ENTRIES} 条）" if total > self.MAX_ENTRIES else ""))
+
+    def _selected_entry(self):
+        """获取选中的记录"""
+        row = self.table.currentRow()
+        if 0 <= row < len(self.entries):
+            return self.entries[row]
+        return None
+
+    def on_open_folder_clicked(self):
+        """打开文件所在目录"""
+        entry = self._selected_entry()
+        if entry:
+            path = self.table.item(self.table.currentRow(), 4).text()
+            self.open_folder_clicked.emit(os.path.dirname(path) if path else "")
+
+    def on_delete_clicked(self):
+        """删除选中的记录"""
+        entry = self._selected_entry()
+        if not entry:
+            return
+
+        reply = QMessageBox.question(
+            self,
+            "确认删除",
+            f"确定要删除这条下载记录吗？\n\n标题: {entry.get('title') or '抖音视频'}\n\n注意：这只会删除记录，不会删除已下载的文件。",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            get_history().remove(entry["aweme_id"])
+            self.load_entries()
+
+    def _format_size(self, size_bytes: int) -> str:
+        """格式化文件大小"""
+        if size_bytes == 0:
+            return "未知"
+
+        for unit in ['B', 'KB', 'MB', 'GB']:
+            if size_bytes < 1024.0:
+                return f"{size_bytes:.1f} {unit}"
+            size_bytes /= 1024.0
+
+        return f"{size_bytes:.1f} TB"
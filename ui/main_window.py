@@ -14,19 +14,32 @@ import platform
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from PyQt5.QtWidgets import QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QMessageBox
-from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtCore import Qt, QSize, QTimer
 from PyQt5.QtGui import QIcon
 from ui.sidebar import Sidebar
 from ui.topbar import TopBar
 from ui.video_list import VideoList
+from ui.history_dialog import HistoryDialog
+from ui.notification import NotificationToast
 from ui.styles import MAIN_WINDOW_STYLE
-from core.downloader import DownloadManager
-from core.thumbnail_extractor import get_video_duration, format_duration
+from core.downloader import DownloadManager, PRIORITY_HIGH, PRIORITY_NORMAL
+from core.link_cache import get_link_cache
 
 
 class MainWindow(QMainWindow):
     """主窗口"""
 
+    # 匹配抖音链接的正则表达式
+    DOUYIN_URL_PATTERNS = [
+        r'https?://v\.douyin\.com/[a-zA-Z0-9]+/?',
+        r'https?://www\.douyin\.com/video/\d+',
+        r'https?://www\.iesdouyin\.com/share/video/\d+',
+        r'https?://dy\.tt/[a-zA-Z0-9]+'
+    ]
+
+    # 汇总通知的等待时间（毫秒），期间完成或失败的任务合并为一条通知
+    NOTICE_DELAY_MS = 800
+
     def __init__(self):
         super().__init__()
         self.download_manager = DownloadManager()
@@ -71,6 +84,14 @@ class MainWindow(QMainWindow):
 
         main_layout.addLayout(content_layout)
 
+        # 非模态通知（合并短时间内的多条完成/失败消息）
+        self.toast = NotificationToast(main_widget)
+        self._notice = {"completed": 0, "files": 0, "errors": []}
+        self.notice_timer = QTimer(self)
+        self.notice_timer.setSingleShot(True)
+        self.notice_timer.setInterval(self.NOTICE_DELAY_MS)
+        self.notice_timer.timeout.connect(self.show_pending_notice)
+
     def connect_signals(self):
         """连接信号槽"""
         # 顶部工具栏信号
@@ -78,6 +99,8 @@ class MainWindow(QMainWindow):
         self.topbar.download_type_changed.connect(self.on_download_type_changed)
         self.topbar.quality_changed.connect(self.on_quality_changed)
         self.topbar.format_changed.connect(self.on_format_changed)
+        self.topbar.set_rate_limit(self.download_manager.get_rate_limit())
+        self.topbar.rate_limit_changed.connect(self.download_manager.set_rate_limit)
 
         # 侧边栏信号
         self.sidebar.page_changed.connect(self.on_page_changed)
@@ -90,10 +113,30 @@ class MainWindow(QMainWindow):
 
         # 下载管理器信号
         self.download_manager.video_added.connect(self.on_video_added)
-        self.download_manager.progress_updated.connect(self.on_progress_updated)
+        self.download_manager.video_info_updated.connect(self.on_video_info_updated)
+        self.download_manager.progress_batch.connect(self.on_progress_batch)
         self.download_manager.status_changed.connect(self.on_status_changed)
         self.download_manager.download_completed.connect(self.on_download_completed)
         self.download_manager.error_occurred.connect(self.on_error_occurred)
+        self.download_manager.download_skipped.connect(self.on_download_skipped)
+        self.download_manager.stats_changed.connect(self.topbar.set_stats)
+        self.download_manager.media_info_ready.connect(self.on_media_info_ready)
+        self.download_manager.cover_ready.connect(self.video_list.update_video_thumbnail)
+
+    def extract_douyin_urls(self, text: str) -> list:
+        """
+        从文本中提取所有抖音链接（按出现顺序去重）
+        支持一次粘贴多条分享文本
+        """
+        import re
+
+        pattern = re.compile('|'.join(f'(?:{p})' for p in self.DOUYIN_URL_PATTERNS))
+        urls = list(dict.fromkeys(match.group(0) for match in pattern.finditer(text)))
+        if urls:
+            return urls
+
+        url = self.extract_douyin_url(text)
+        return [url] if self.is_douyin_url(url) else []
 
     def extract_douyin_url(self, text: str) -> str:
         """
@@ -102,15 +145,7 @@ class MainWindow(QMainWindow):
         """
         import re
 
-        # 匹配抖音链接的正则表达式
-        patterns = [
-            r'https?://v\.douyin\.com/[a-zA-Z0-9]+/?',
-            r'https?://www\.douyin\.com/video/\d+',
-            r'https?://www\.iesdouyin\.com/share/video/\d+',
-            r'https?://dy\.tt/[a-zA-Z0-9]+'
-        ]
-
-        for pattern in patterns:
+        for pattern in self.DOUYIN_URL_PATTERNS:
             match = re.search(pattern, text)
             if match:
                 return match.group(0)
@@ -132,11 +167,11 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "提示", "剪贴板为空，请先复制抖音视频链接")
             return
 
-        # 从文本中提取 URL
-        url = self.extract_douyin_url(clipboard_text)
+        # 从文本中提取 URL（可能包含多条）
+        urls = self.extract_douyin_urls(clipboard_text)
 
         # 验证是否为抖音链接
-        if not self.is_douyin_url(url):
+        if not urls:
             QMessageBox.warning(self, "提示",
                               f"未找到有效的抖音链接\n\n支持的格式：\n- https://v.douyin.com/xxxxx/\n- https://www.douyin.com/video/xxxxx\n\n剪贴板内容：\n{clipboard_text[:100]}...")
             return
@@ -144,7 +179,10 @@ class MainWindow(QMainWindow):
         # 添加下载任务
         try:
             self.topbar.set_status("正在解析链接...")
-            self.download_manager.add_download(url)
+            # 单条链接优先下载并多分带宽，批量粘贴的任务排在其后
+            priority = PRIORITY_HIGH if len(urls) == 1 else PRIORITY_NORMAL
+            for url in urls:
+                self.download_manager.add_download(url, priority=priority)
             self.topbar.set_status(f"已添加下载任务 (共 {self.video_list.get_video_count()} 个)")
         except Exception as e:
             QMessageBox.critical(self, "错误", f"添加下载任务失败：{str(e)}")
@@ -174,6 +212,11 @@ class MainWindow(QMainWindow):
         print(f"页面切换: {page_id}")
         if page_id == "settings":
             QMessageBox.information(self, "设置", "设置功能开发中...")
+        elif page_id == "history":
+            dialog = HistoryDialog(self)
+            dialog.open_folder_clicked.connect(self.open_directory)
+            dialog.exec_()
+            self.sidebar.set_active_page("download")
 
     def on_download_clicked(self, video_id: str):
         """下载按钮点击"""
@@ -191,24 +234,27 @@ class MainWindow(QMainWindow):
 
     def on_delete_clicked(self, video_id: str):
         """删除按钮点击"""
-        # 获取视频卡片信息
-        if video_id not in self.video_list.video_cards:
+        # 获取任务信息
+        video_data = self.video_list.get_video_data(video_id)
+        if video_data is None:
             return
 
-        video_card = self.video_list.video_cards[video_id]
-        video_title = video_card.video_data.get("title", "未知视频")
+        video_title = video_data.get("title", "未知视频")
 
         # 确认删除
         reply = QMessageBox.question(
             self,
             "确认删除",
-            f"确定要删除这个任务吗？\n\n标题: {video_title}\n\n注意：这只会删除任务卡片，不会删除已下载的文件。",
+            f"确定要删除这个任务吗？\n\n标题: {video_title}\n\n注意：这只会删除下载任务，不会删除已下载的文件。",
             QMessageBox.Yes | QMessageBox.No,
             QMessageBox.No
         )
 
         if reply == QMessageBox.Yes:
-            # 删除视频卡片
+            # 取消尚未开始的下载，并从任务统计中移除
+            self.download_manager.remove_task(video_id)
+
+            # 从列表中删除
             self.video_list.remove_video(video_id)
 
             # 更新状态栏
@@ -222,53 +268,74 @@ class MainWindow(QMainWindow):
         """视频添加完成"""
         self.video_list.add_video(video_data)
 
-    def on_progress_updated(self, video_id: str, progress: int, message: str):
-        """进度更新"""
-        self.video_list.update_video_progress(video_id, progress)
+    def on_video_info_updated(self, video_id: str, video_data: dict):
+        """视频解析完成"""
+        self.video_list.update_video_info(video_id, video_data)
+
+    def on_progress_batch(self, changes: dict):
+        """进度批量更新（由下载管理器定时发出）"""
+        self.video_list.update_progress_batch(changes)
 
     def on_status_changed(self, video_id: str, status: str):
         """状态改变"""
         self.video_list.update_video_status(video_id, status)
 
     def on_download_completed(self, video_id: str, result: dict):
-        """下载完成"""
+        """下载完成（时长、分辨率等信息由后台后处理线程补充）"""
         # 更新状态栏
-        success_count = sum(1 for card in self.video_list.video_cards.values()
-                          if card.video_data.get("status") == "success")
+        success_count = self.download_manager.task_store.count("success")
         self.topbar.set_status(f"已完成 {success_count} 个下载")
 
-        # 更新缩略图、文件大小和时长
-        downloaded_files = result.get("downloaded_files", [])
-        for file_info in downloaded_files:
-            if file_info.get("type") == "video":
-                # 更新缩略图
-                thumbnail_path = file_info.get("thumbnail")
-                if thumbnail_path:
-                    self.video_list.update_video_thumbnail(video_id, thumbnail_path)
-                    print(f"📸 已更新视频 {video_id} 的缩略图")
-
-                # 更新文件大小
-                video_path = file_info.get("path")
-                if video_path and os.path.exists(video_path):
-                    file_size = os.path.getsize(video_path)
-                    self.video_list.update_video_file_size(video_id, file_size)
-                    print(f"💾 已更新视频 {video_id} 的文件大小")
-
-                    # 更新视频时长
-                    duration_seconds = get_video_duration(video_path)
-                    if duration_seconds > 0:
-                        duration_str = format_duration(duration_seconds)
-                        self.video_list.update_video_duration(video_id, duration_str)
-                        print(f"⏱️ 已更新视频 {video_id} 的时长: {duration_str}")
-
-        # 显示通知
-        file_count = len(downloaded_files)
-        QMessageBox.information(self, "下载完成",
-                              f"视频下载完成！\n共下载 {file_count} 个文件")
+        # 汇总通知
+        self._notice["completed"] += 1
+        self._notice["files"] += len(result.get("downloaded_files", []))
+        self.notice_timer.start()
+
+    def on_media_info_ready(self, video_id: str, media_info: dict):
+        """后处理完成：更新缩略图、文件大小、时长和分辨率"""
+        if media_info.get("thumbnail"):
+            self.video_list.update_video_thumbnail(video_id, media_info["thumbnail"])
+        if media_info.get("size"):
+            self.video_list.update_video_file_size(video_id, media_info["size"])
+        if media_info.get("duration"):
+            self.video_list.update_video_duration(video_id, media_info["duration"])
+        if media_info.get("resolution"):
+            self.video_list.update_video_info(video_id, {"resolution": media_info["resolution"]})
+
+    def show_pending_notice(self):
+        """显示汇总后的完成/失败通知"""
+        completed, files, errors = self._notice["completed"], self._notice["files"], self._notice["errors"]
+        self._notice = {"completed": 0, "files": 0, "errors": []}
+
+        lines = []
+        if completed:
+            lines.append(f"{completed} 个任务下载完成，共 {files} 个文件")
+        if errors:
+            lines.append(f"{len(errors)} 个任务下载失败：")
+            lines.extend(f"· {title}：{message}" for title, message in errors[:3])
+            if len(errors) > 3:
+                lines.append(f"…… 另有 {len(errors) - 3} 个")
+        if not lines:
+            return
+
+        title = "下载失败" if errors and not completed else "下载完成"
+        self.toast.show_message(title, "\n".join(lines), "error" if errors else "info",
+                                duration_ms=8000 if errors else 4000)
+
+    def on_download_skipped(self, video_id: str, record: dict):
+        """已下载过的作品，跳过下载"""
+        self.video_list.update_video_status(video_id, "success")
+        self.video_list.update_video_file_size(video_id, record.get("total_size") or 0)
+        thumbnail_path = next((f.get("thumbnail") for f in record.get("files", []) if f.get("thumbnail")), None)
+        if thumbnail_path:
+            self.video_list.update_video_thumbnail(video_id, thumbnail_path)
+        self.topbar.set_status(f"已下载过，跳过: {(record.get('title') or '抖音视频')[:20]}")
 
     def on_error_occurred(self, video_id: str, error_message: str):
         """错误发生"""
-        QMessageBox.warning(self, "下载失败", f"视频下载失败：\n{error_message}")
+        video_data = self.video_list.get_video_data(video_id) or {}
+        self._notice["errors"].append(((video_data.get("title") or "抖音视频")[:20], error_message[:60]))
+        self.notice_timer.start()
 
     def open_directory(self, path: str):
         """打开目录"""
@@ -290,8 +357,7 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """关闭事件"""
         # 检查是否有正在下载的任务
-        has_downloading = any(card.video_data.get("status") == "downloading"
-                            for card in self.video_list.video_cards.values())
+        has_downloading = self.download_manager.task_store.count("downloading") > 0
 
         if has_downloading:
             reply = QMessageBox.question(self, "确认退出",
@@ -302,4 +368,6 @@ class MainWindow(QMainWindow):
                 event.ignore()
                 return
 
+        # 保存短链接缓存的使用时间
+        get_link_cache().flush()
         event.accept()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+非模态通知提示
+显示在窗口右下角，几秒后自动隐藏，不打断当前操作
+"""
+
+import os
+import sys
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from PyQt5.QtWidgets import QFrame, QVBoxLayout, QLabel
+from PyQt5.QtCore import Qt, QTimer, QEvent
+from ui.styles import NOTIFICATION_STYLE
+
+
+class NotificationToast(QFrame):
+    """窗口右下角的通知提示"""
+
+    MARGIN = 20
+    WIDTH = 320
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setObjectName("notificationToast")
+        self.init_ui()
+
+        self.hide_timer = QTimer(self)
+        self.hide_timer.setSingleShot(True)
+        self.hide_timer.timeout.connect(self.hide)
+
+        # 跟随父窗口大小调整位置
+        parent.installEventFilter(self)
+
+    def init_ui(self):
+        """初始化UI"""
+        self.setStyleSheet(NOTIFICATION_STYLE)
+        self.setFixedWidth(self.WIDTH)
+        self.setCursor(Qt.PointingHandCursor)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(15, 12, 15, 12)
+        layout.setSpacing(4)
+
+        self.title_label = QLabel()
+        self.title_label.setObjectName("notificationTitle")
+        layout.addWidget(self.title_label)
+
+        self.text_label = QLabel()
+        self.text_label.setObjectName("notificationText")
+        self.text_label.setWordWrap(True)
+        layout.addWidget(self.text_label)
+
+        self.hide()
+
+    def show_message(self, title: str, text: str, level: str = "info", duration_ms: int = 4000):
+        """
+        显示通知
+        :param level: info 或 error
+        :param duration_ms: 显示时长（毫秒）
+        """
+        self.title_label.setText(title)
+        self.text_label.setText(text)
+        self.setProperty("level", level)
+        self.style().unpolish(self)
+        self.style().polish(self)
+
+        self.adjustSize()
+        self._reposition()
+        self.show()
+        self.raise_()
+        self.hide_timer.start(duration_ms)
+
+    def _reposition(self):
+        """移动到父窗口右下角"""
+        parent = self.parentWidget()
+        if parent:
+            self.move(parent.width() - self.width() - self.MARGIN,
+                      parent.height() - self.height() - self.MARGIN)
+
+    def eventFilter(self, obj, event):
+        if obj is self.parentWidget() and event.type() == QEvent.Resize and self.isVisible():
+            self._reposition()
+        return super().eventFilter(obj, event)
+
+    def mousePressEvent(self, event):
+        """点击关闭"""
+        self.hide_timer.stop()
+        self.hide()
@@ -52,6 +52,9 @@ class Sidebar(QWidget):
         self.download_btn.setProperty("active", "true")
         layout.addWidget(self.download_btn)
 
+        self.history_btn = self.create_nav_button("🕘\n下载历史", "history")
+        layout.addWidget(self.history_btn)
+
         # 暂时禁用其他功能
         # self.browser_btn = self.create_nav_button("🌐\n浏览器嗅探", "browser")
         # layout.addWidget(self.browser_btn)
@@ -92,7 +95,13 @@ class Sidebar(QWidget):
         if page_id == self.current_page:
             return
 
-        # 更新按钮状态
+        self.set_active_page(page_id)
+
+        # 发送信号
+        self.page_changed.emit(page_id)
+
+    def set_active_page(self, page_id: str):
+        """设置当前高亮的页面（不发送信号）"""
         self.current_page = page_id
         for i in range(self.layout().count()):
             widget = self.layout().itemAt(i).widget()
@@ -102,6 +111,3 @@ class Sidebar(QWidget):
                     widget.setProperty("active", "true" if widget_page_id == page_id else "false")
                     widget.style().unpolish(widget)
                     widget.style().polish(widget)
-
-        # 发送信号
-        self.page_changed.emit(page_id)
@@ -135,93 +135,57 @@ QLabel {{
 
 # 视频列表样式
 VIDEO_LIST_STYLE = f"""
-QScrollArea {{
+QListView#videoListView {{
     border: none;
     background-color: transparent;
+    outline: none;
 }}
+"""
 
-QWidget#contentWidget {{
-    background-color: transparent;
-}}
+# 任务列表项配色（由 VideoItemDelegate 绘制）
+VIDEO_ITEM_COLORS = {
+    "card": WHITE_COLOR,
+    "border": BORDER_COLOR,
+    "border_hover": PRIMARY_COLOR,
+    "title": TEXT_COLOR,
+    "info": TEXT_SECONDARY,
+    "thumbnail": "#E0E0E0",
+    "progress_bg": BACKGROUND_COLOR,
+    "progress": PRIMARY_COLOR,
+    "button_hover": HOVER_COLOR,
+}
+
+# 任务状态配色：(背景色, 文字颜色)
+STATUS_COLORS = {
+    "statusPending": ("#FFF3CD", "#856404"),
+    "statusDownloading": ("#D1ECF1", "#0C5460"),
+    "statusSuccess": ("#D4EDDA", "#155724"),
+    "statusError": ("#F8D7DA", "#721C24"),
+}
 
-QFrame#videoCard {{
+# 通知提示样式
+NOTIFICATION_STYLE = f"""
+QFrame#notificationToast {{
     background-color: {WHITE_COLOR};
     border: 1px solid {BORDER_COLOR};
+    border-left: 4px solid {PRIMARY_COLOR};
     border-radius: 8px;
-    margin: 3px 12px;
-    padding: 0px;
 }}
 
-QFrame#videoCard:hover {{
-    border-color: {PRIMARY_COLOR};
-    box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+QFrame#notificationToast[level="error"] {{
+    border-left-color: {ERROR_COLOR};
 }}
 
-QLabel#videoTitle {{
+QLabel#notificationTitle {{
     color: {TEXT_COLOR};
     font-size: 14px;
     font-weight: 600;
-    line-height: 1.3;
 }}
 
-QLabel#videoInfo {{
+QLabel#notificationText {{
     color: {TEXT_SECONDARY};
     font-size: 12px;
 }}
-
-QLabel#statusLabel {{
-    font-size: 11px;
-    padding: 3px 8px;
-    border-radius: 3px;
-}}
-
-QLabel#statusPending {{
-    background-color: #FFF3CD;
-    color: #856404;
-}}
-
-QLabel#statusDownloading {{
-    background-color: #D1ECF1;
-    color: #0C5460;
-}}
-
-QLabel#statusSuccess {{
-    background-color: #D4EDDA;
-    color: #155724;
-}}
-
-QLabel#statusError {{
-    background-color: #F8D7DA;
-    color: #721C24;
-}}
-
-QPushButton#actionButton {{
-    background-color: transparent;
-    border: 1px solid {BORDER_COLOR};
-    border-radius: 6px;
-    padding: 8px 15px;
-    color: {TEXT_COLOR};
-    font-size: 13px;
-}}
-
-QPushButton#actionButton:hover {{
-    background-color: {HOVER_COLOR};
-    border-color: {PRIMARY_COLOR};
-}}
-
-QProgressBar {{
-    border: none;
-    border-radius: 3px;
-    background-color: {BACKGROUND_COLOR};
-    text-align: center;
-    height: 6px;
-    font-size: 10px;
-}}
-
-QProgressBar::chunk {{
-    background-color: {PRIMARY_COLOR};
-    border-radius: 4px;
-}}
 """
 
 # 空状态样式
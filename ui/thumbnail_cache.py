@@ -0,0 +1,315 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+缩略图缓存
+- 内存：按 aweme_id 索引的 LRU，列表滚动时直接取用，不读磁盘也不解码
+- 磁盘：按原图内容的 SHA-256 保存缩放后的小图，总大小超过上限时删除最久未用的文件
+- 解码：在后台线程用 QImageReader.setScaledSize 直接解码到目标尺寸
+"""
+
+import os
+import sys
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+# 添加父目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from PyQt5.QtCore import (QObject, QRunnable, QThreadPool, QSize, QBuffer, QByteArray, QIODevice, QTimer,
+                          QCoreApplication, pyqtSignal)
+from PyQt5.QtGui import QImage, QImageReader, QPixmap
+
+from core.config import get_setting, get_cache_dir
+
+# 列表中缩略图的尺寸
+THUMBNAIL_SIZE = QSize(120, 68)
+
+# 磁盘缓存清理后保留的比例
+EVICT_TARGET_RATIO = 0.8
+
+
+class ThumbnailDiskCache:
+    """
+    磁盘缩略图缓存（线程安全）
+    文件名为原图内容的 SHA-256；另记录 路径 -> (大小, 修改时间, 哈希)，原图未变时不必重新读取
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Any]] = None
+        self._index_dirty = False
+        self._total_bytes: Optional[int] = None
+
+    def _load_index(self) -> Dict[str, Any]:
+        """首次使用时读取索引（调用方持有锁）"""
+        if self._index is None:
+            try:
+                with open(os.path.join(self.cache_dir, self.INDEX_FILE), 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _entry_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, f"{digest}.png")
+
+    def lookup(self, source_path: str, stat: os.stat_result) -> Optional[str]:
+        """
+        按原图路径查询（原图大小和修改时间不变时有效）
+        :return: 缓存文件路径，未命中返回 None
+        """
+        with self._lock:
+            entry = self._load_index().get(source_path)
+        if not entry or entry[0] != stat.st_size or entry[1] != stat.st_mtime_ns:
+            return None
+        path = self._entry_path(entry[2])
+        return path if os.path.exists(path) else None
+
+    def lookup_digest(self, source_path: str, stat: os.stat_result, digest: str) -> Optional[str]:
+        """按内容哈希查询（同一张图片换了路径也能命中），命中时记录路径索引"""
+        path = self._entry_path(digest)
+        if not os.path.exists(path):
+            return None
+        self._remember(source_path, stat, digest)
+        return path
+
+    def store(self, source_path: str, stat: os.stat_result, digest: str, image: QImage) -> Optional[str]:
+        """保存缩放后的图片，必要时清理旧文件"""
+        path = self._entry_path(digest)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        if not image.save(tmp_path, "PNG"):
+            return None
+        try:
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+
+        self._remember(source_path, stat, digest)
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+        return path
+
+    def touch(self, path: str):
+        """更新使用时间（按修改时间淘汰）"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _remember(self, source_path: str, stat: os.stat_result, digest: str):
+        with self._lock:
+            self._load_index()[source_path] = [stat.st_size, stat.st_mtime_ns, digest]
+            self._index_dirty = True
+
+    def _scan_size(self) -> int:
+        """统计缓存文件总大小（调用方持有锁）"""
+        total = 0
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".png"):
+                    total += entry.stat().st_size
+        return total
+
+    def _evict(self):
+        """删除最久未用的文件，直到总大小低于上限的 80%（调用方持有锁）"""
+        files = []
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".png"):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * EVICT_TARGET_RATIO
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._total_bytes = total
+
+        # 索引中指向已删除文件的条目一并清除
+        index = self._load_index()
+        for source_path in [k for k, v in index.items() if not os.path.exists(self._entry_path(v[2]))]:
+            del index[source_path]
+        self._index_dirty = True
+
+    def save_index(self):
+        """把路径索引写回磁盘"""
+        with self._lock:
+            if not self._index_dirty or self._index is None:
+                return
+            data = json.dumps(self._index, ensure_ascii=False)
+            self._index_dirty = False
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        tmp_path = index_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            print(f"⚠️ 保存缩略图索引失败: {e}")
+
+
+def decode_scaled(data: bytes, size: QSize = THUMBNAIL_SIZE) -> QImage:
+    """直接解码到目标尺寸（JPEG 等格式解码时即缩小，不生成原尺寸图片）"""
+    buffer = QBuffer()
+    buffer.setData(QByteArray(data))
+    buffer.open(QIODevice.ReadOnly)
+    reader = QImageReader(buffer)
+    reader.setDecideFormatFromContent(True)
+    reader.setScaledSize(size)
+    return reader.read()
+
+
+def load_thumbnail(source_path: str, disk_cache: ThumbnailDiskCache) -> QImage:
+    """
+    读取缩略图：先查磁盘缓存，未命中时解码原图并写入缓存（在后台线程调用）
+    :return: 目标尺寸的图片，失败时为空图片
+    """
+    try:
+        stat = os.stat(source_path)
+        cached = disk_cache.lookup(source_path, stat)
+        if cached is None:
+            with open(source_path, 'rb') as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            cached = disk_cache.lookup_digest(source_path, stat, digest)
+            if cached is None:
+                image = decode_scaled(data)
+                if not image.isNull():
+                    disk_cache.store(source_path, stat, digest, image)
+                return image
+
+        disk_cache.touch(cached)
+        return QImage(cached)
+
+    except OSError:
+        return QImage()
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """文件的 (大小, 修改时间)，用于判断原图是否变化"""
+    try:
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+    except OSError:
+        return None
+
+
+class _LoadTask(QRunnable):
+    """后台解码任务"""
+
+    def __init__(self, cache: "ThumbnailCache", key: str, source_path: str):
+        super().__init__()
+        self.cache = cache
+        self.key = key
+        self.source_path = source_path
+
+    def run(self):
+        signature = _file_signature(self.source_path)
+        image = load_thumbnail(self.source_path, self.cache.disk_cache)
+        self.cache._loaded.emit(self.key, self.source_path, image, signature)
+
+
+class ThumbnailCache(QObject):
+    """
+    界面使用的缩略图缓存
+    get() 只查内存，未命中时交给后台线程加载，加载完成后发出 thumbnail_ready
+    """
+
+    thumbnail_ready = pyqtSignal(str)  # key
+    _loaded = pyqtSignal(str, str, QImage, object)  # key, 原图路径, 图片, 原图签名（后台线程发出）
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.max_entries = max(1, int(get_setting("cache", "thumbnail_memory_entries", 500)))
+        self.disk_cache = ThumbnailDiskCache(
+            get_cache_dir("thumbnails"),
+            int(get_setting("cache", "thumbnail_disk_max_bytes", 64 * 1024 * 1024))
+        )
+
+        # key -> (原图路径, 图片, 原图签名)
+        self._memory: "OrderedDict[str, Tuple[str, QPixmap, Any]]" = OrderedDict()
+        self._pending = set()
+        self._failed = set()
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, int(get_setting("cache", "thumbnail_decode_threads", 2))))
+        self._loaded.connect(self._on_loaded)
+
+        # 路径索引延迟写盘，批量加载时只写一次
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(2000)
+        self._save_timer.timeout.connect(self.disk_cache.save_index)
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.disk_cache.save_index)
+
+    def get(self, key: Optional[str], source_path: Optional[str]) -> Optional[QPixmap]:
+        """
+        获取缩略图（不阻塞）
+        :param key: 缓存键（aweme_id，没有时用原图路径）
+        :param source_path: 原图路径
+        :return: 已缓存的图片；未缓存时返回 None 并在后台加载
+        """
+        if not source_path:
+            return None
+        key = key or source_path
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            if entry[0] == source_path:
+                return entry[1]
+
+        if (key, source_path) not in self._pending and (key, source_path) not in self._failed:
+            self._pending.add((key, source_path))
+            self.pool.start(_LoadTask(self, key, source_path))
+
+        # 换了原图（如封面换成视频截图）时，加载完成前继续显示旧图
+        return entry[1] if entry is not None else None
+
+    def forget(self, source_path: str):
+        """原图文件可能已更新：内容变化时重新加载"""
+        self._failed = {item for item in self._failed if item[1] != source_path}
+        signature = _file_signature(source_path)
+        for key in [k for k, v in self._memory.items() if v[0] == source_path and v[2] != signature]:
+            del self._memory[key]
+
+    def _on_loaded(self, key: str, source_path: str, image: QImage, signature):
+        """后台加载完成（界面线程）"""
+        self._pending.discard((key, source_path))
+        if image.isNull():
+            self._failed.add((key, source_path))
+            return
+
+        self._memory[key] = (source_path, QPixmap.fromImage(image), signature)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+        self._save_timer.start()
+        self.thumbnail_ready.emit(key)
+
+    def __len__(self) -> int:
+        return len(self._memory)
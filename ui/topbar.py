@@ -15,6 +15,17 @@ from PyQt5.QtWidgets import (QWidget, QHBoxLayout, QPushButton, QComboBox,
                             QLabel, QApplication)
 from PyQt5.QtCore import Qt, pyqtSignal
 from ui.styles import TOPBAR_STYLE
+from typing import Dict, Any
+
+# 限速选项：(显示文本, 字节/秒)，0 表示不限速
+RATE_LIMIT_OPTIONS = [
+    ("不限速", 0),
+    ("512 KB/s", 512 * 1024),
+    ("1 MB/s", 1024 * 1024),
+    ("2 MB/s", 2 * 1024 * 1024),
+    ("5 MB/s", 5 * 1024 * 1024),
+    ("10 MB/s", 10 * 1024 * 1024),
+]
 
 
 class TopBar(QWidget):
@@ -25,6 +36,7 @@ class TopBar(QWidget):
     download_type_changed = pyqtSignal(str)
     quality_changed = pyqtSignal(str)
     format_changed = pyqtSignal(str)
+    rate_limit_changed = pyqtSignal(int)  # 字节/秒，0 表示不限速
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -80,6 +92,16 @@ class TopBar(QWidget):
         self.format_combo.currentTextChanged.connect(self.on_format_changed)
         layout.addWidget(self.format_combo)
 
+        # 限速选择
+        rate_label = QLabel("限速")
+        layout.addWidget(rate_label)
+
+        self.rate_combo = QComboBox()
+        for text, rate in RATE_LIMIT_OPTIONS:
+            self.rate_combo.addItem(text, rate)
+        self.rate_combo.currentIndexChanged.connect(self.on_rate_limit_changed)
+        layout.addWidget(self.rate_combo)
+
         # 添加弹性空间
         layout.addStretch()
 
@@ -88,6 +110,11 @@ class TopBar(QWidget):
         self.status_label.setStyleSheet("color: #6C757D; font-size: 13px;")
         layout.addWidget(self.status_label)
 
+        # 任务统计
+        self.stats_label = QLabel("")
+        self.stats_label.setStyleSheet("color: #6C757D; font-size: 13px;")
+        layout.addWidget(self.stats_label)
+
     def on_paste_clicked(self):
         """粘贴按钮点击事件"""
         self.paste_clicked.emit()
@@ -104,10 +131,47 @@ class TopBar(QWidget):
         """格式改变事件"""
         self.format_changed.emit(text)
 
+    def on_rate_limit_changed(self, index: int):
+        """限速改变事件"""
+        self.rate_limit_changed.emit(int(self.rate_combo.itemData(index) or 0))
+
+    def set_rate_limit(self, rate: int):
+        """
+        显示当前限速（不发出 rate_limit_changed）
+        :param rate: 字节/秒，不在选项中时追加一项
+        """
+        index = self.rate_combo.findData(rate)
+        if index < 0:
+            self.rate_combo.addItem(f"{rate / 1024:.0f} KB/s", rate)
+            index = self.rate_combo.count() - 1
+        self.rate_combo.blockSignals(True)
+        self.rate_combo.setCurrentIndex(index)
+        self.rate_combo.blockSignals(False)
+
     def set_status(self, text: str):
         """设置状态文本"""
         self.status_label.setText(text)
 
+    def set_stats(self, stats: Dict[str, Any]):
+        """
+        显示任务统计
+        :param stats: DownloadManager.get_stats() 的结果
+        """
+        if not stats.get("total"):
+            self.stats_label.setText("")
+            return
+
+        parts = [f"⬇️ {stats.get('downloading', 0)}",
+                 f"⏳ {stats.get('resolving', 0) + stats.get('pending', 0)}",
+                 f"✅ {stats.get('success', 0)}"]
+        if stats.get("error"):
+            parts.append(f"❌ {stats['error']}")
+        text = "  ".join(parts)
+        if stats.get("downloading") and stats.get("rate"):
+            rate = stats["rate"] / 1024
+            text += f" · {rate / 1024:.1f} MB/s" if rate >= 1024 else f" · {rate:.0f} KB/s"
+        self.stats_label.setText(text)
+
     def get_clipboard_text(self) -> str:
         """获取剪贴板文本"""
         clipboard = QApplication.clipboard()
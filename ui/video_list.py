@@ -3,6 +3,8 @@
 
 """
 视频列表组件
+任务数据保存在 VideoListModel 中，由 VideoItemDelegate 只绘制可见行，
+任务数量再多，内存和绘制开销也只与可见区域有关
 """
 
 import os
@@ -11,231 +13,329 @@ import sys
 # 添加父目录到路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QScrollArea,
-                            QFrame, QLabel, QPushButton, QProgressBar)
-from PyQt5.QtCore import Qt, pyqtSignal, QSize
-from PyQt5.QtGui import QPixmap
-from ui.styles import VIDEO_LIST_STYLE, EMPTY_STATE_STYLE
-from typing import Dict, Any, List
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QLabel, QListView,
+                            QStyledItemDelegate, QStyle, QAbstractItemView)
+from PyQt5.QtCore import (Qt, pyqtSignal, QSize, QRect, QEvent, QModelIndex,
+                          QAbstractListModel)
+from PyQt5.QtGui import QPixmap, QPainter, QColor, QFont, QFontMetrics, QPen, QCursor
+from ui.styles import VIDEO_LIST_STYLE, EMPTY_STATE_STYLE, VIDEO_ITEM_COLORS, STATUS_COLORS
+from ui.thumbnail_cache import ThumbnailCache, THUMBNAIL_SIZE
+from typing import Dict, Any, List, Optional
 
 
-class VideoCard(QFrame):
-    """视频卡片组件"""
+def format_size(size_bytes: float) -> str:
+    """格式化文件大小"""
+    if size_bytes == 0:
+        return "未知"
 
-    # 定义信号
-    download_clicked = pyqtSignal(str)  # 下载按钮点击
-    open_folder_clicked = pyqtSignal(str)  # 打开文件夹
-    refresh_clicked = pyqtSignal(str)  # 刷新
-    delete_clicked = pyqtSignal(str)  # 删除
-
-    def __init__(self, video_data: Dict[str, Any], parent=None):
-        super().__init__(parent)
-        self.video_data = video_data
-        self.video_id = video_data.get("id", "")
-        self.setObjectName("videoCard")
-        self.init_ui()
-
-    def init_ui(self):
-        """初始化UI"""
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(8, 8, 8, 8)  # 进一步减小内边距：10→8
-        layout.setSpacing(10)  # 减小间距：12→10
-        layout.setAlignment(Qt.AlignTop)  # 设置整体顶部对齐
-
-        # 左侧：缩略图（减小尺寸）
-        self.thumbnail_label = QLabel()
-        self.thumbnail_label.setFixedSize(QSize(120, 68))  # 从160x90减小到120x68（保持16:9比例）
-        self.thumbnail_label.setScaledContents(True)
-        self.thumbnail_label.setText("🎬")
-        self.thumbnail_label.setAlignment(Qt.AlignCenter)
-        self.thumbnail_label.setStyleSheet("border-radius: 6px; background-color: #E0E0E0; font-size: 28px;")
-
-        # 添加缩略图，固定宽度，顶部对齐
-        layout.addWidget(self.thumbnail_label, 0, Qt.AlignTop)  # 拉伸因子为0，顶部对齐
-
-        # 中间：视频信息
-        info_layout = QVBoxLayout()
-        info_layout.setSpacing(4)  # 进一步减小间距：6→4
-
-        # 标题
-        title_label = QLabel(self.video_data.get("title", "未知标题"))
-        title_label.setObjectName("videoTitle")
-        title_label.setWordWrap(True)
-        title_label.setMaximumWidth(600)
-        info_layout.addWidget(title_label)
-
-        # 视频信息行
-        info_row = QHBoxLayout()
-        info_row.setSpacing(10)  # 减小间距：15→10
-
-        # 格式
-        format_icon = QLabel("📄")
-        format_label = QLabel(self.video_data.get("format", "MP4"))
-        format_label.setObjectName("videoInfo")
-        info_row.addWidget(format_icon)
-        info_row.addWidget(format_label)
-
-        # 大小
-        size_icon = QLabel("💾")
-        self.size_label = QLabel(self.video_data.get("size", "未知"))
-        self.size_label.setObjectName("videoInfo")
-        info_row.addWidget(size_icon)
-        info_row.addWidget(self.size_label)
-
-        # 分辨率
-        resolution_icon = QLabel("📺")
-        resolution_label = QLabel(self.video_data.get("resolution", "未知"))
-        resolution_label.setObjectName("videoInfo")
-        info_row.addWidget(resolution_icon)
-        info_row.addWidget(resolution_label)
-
-        # 时长
-        duration_icon = QLabel("⏱️")
-        self.duration_label = QLabel(self.video_data.get("duration", "未知"))
-        self.duration_label.setObjectName("videoInfo")
-        info_row.addWidget(duration_icon)
-        info_row.addWidget(self.duration_label)
-
-        info_row.addStretch()
-
-        info_layout.addLayout(info_row)
-
-        # 状态和进度条放在同一行
-        status_progress_layout = QHBoxLayout()
-        status_progress_layout.setSpacing(10)
-
-        # 状态标签
-        self.status_label = QLabel()
-        self.status_label.setMinimumWidth(80)  # 设置最小宽度，确保状态文字不被挤压
-        status_progress_layout.addWidget(self.status_label)
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size_bytes < 1024.0:
+            return f"{size_bytes:.1f} {unit}"
+        size_bytes /= 1024.0
 
-        # 进度条
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setMaximum(100)
-        self.progress_bar.setValue(self.video_data.get("progress", 0))
-        self.progress_bar.setTextVisible(True)
-        self.progress_bar.setMinimumWidth(300)  # 设置最小宽度，确保进度条足够长
-        self.progress_bar.setVisible(self.video_data.get("status") == "downloading")
-        status_progress_layout.addWidget(self.progress_bar)
+    return f"{size_bytes:.1f} TB"
 
-        status_progress_layout.addStretch()
 
-        info_layout.addLayout(status_progress_layout)
+class VideoListModel(QAbstractListModel):
+    """任务列表数据模型"""
 
-        # 更新状态（在进度条创建之后）
-        self.update_status(self.video_data.get("status", "pending"))
+    # 返回整条任务数据的角色
+    VideoDataRole = Qt.UserRole + 1
 
-        # 移除 addStretch() - 这是导致卡片高度过大的主要原因
-
-        # 添加信息布局到主布局，设置拉伸因子
-        layout.addLayout(info_layout, 1)  # 拉伸因子为1，占据剩余空间
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._items: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}  # video_id -> 行号
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._items)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._items):
+            return None
+        item = self._items[index.row()]
+        if role == self.VideoDataRole:
+            return item
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return item.get("title", "")
+        return None
 
-        # 右侧：操作按钮
-        actions_layout = QVBoxLayout()
-        actions_layout.setSpacing(4)  # 进一步减小间距：6→4
-
-        # 刷新按钮
-        refresh_btn = QPushButton("🔄")
-        refresh_btn.setObjectName("actionButton")
-        refresh_btn.setFixedSize(QSize(28, 28))  # 减小按钮尺寸
-        refresh_btn.setCursor(Qt.PointingHandCursor)
-        refresh_btn.clicked.connect(lambda: self.refresh_clicked.emit(self.video_id))
-        actions_layout.addWidget(refresh_btn)
-
-        # 打开文件夹按钮
-        folder_btn = QPushButton("📁")
-        folder_btn.setObjectName("actionButton")
-        folder_btn.setFixedSize(QSize(28, 28))  # 减小按钮尺寸
-        folder_btn.setCursor(Qt.PointingHandCursor)
-        folder_btn.clicked.connect(lambda: self.open_folder_clicked.emit(self.video_id))
-        actions_layout.addWidget(folder_btn)
-
-        # 删除按钮
-        delete_btn = QPushButton("🗑️")
-        delete_btn.setObjectName("actionButton")
-        delete_btn.setFixedSize(QSize(28, 28))  # 减小按钮尺寸
-        delete_btn.setCursor(Qt.PointingHandCursor)
-        delete_btn.setToolTip("删除任务")
-        delete_btn.clicked.connect(lambda: self.delete_clicked.emit(self.video_id))
-        actions_layout.addWidget(delete_btn)
-
-        # 更多选项按钮
-        more_btn = QPushButton("⋮")
-        more_btn.setObjectName("actionButton")
-        more_btn.setFixedSize(QSize(28, 28))  # 减小按钮尺寸
-        more_btn.setCursor(Qt.PointingHandCursor)
-        actions_layout.addWidget(more_btn)
-
-        # 移除 addStretch() - 避免按钮区域占据过多垂直空间
-
-        # 添加操作按钮布局，固定宽度，顶部对齐
-        layout.addLayout(actions_layout, 0)  # 拉伸因子为0，固定宽度
-
-    def update_status(self, status: str):
+    def add_video(self, video_data: Dict[str, Any]):
+        """添加任务（已存在时更新）"""
+        video_id = video_data.get("id", "")
+        if video_id in self._rows:
+            self.update_video(video_id, video_data)
+            return
+
+        row = len(self._items)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._items.append(dict(video_data))
+        self._rows[video_id] = row
+        self.endInsertRows()
+
+    def get_video_data(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """获取任务数据"""
+        row = self._rows.get(video_id)
+        return self._items[row] if row is not None else None
+
+    def update_video(self, video_id: str, fields: Dict[str, Any]) -> bool:
         """
-        更新状态
-        :param status: pending, downloading, success, error
+        更新单个任务的字段
+        :return: 任务是否存在
         """
-        status_map = {
-            "pending": ("⏳ 等待中", "statusPending"),
-            "downloading": ("⬇️ 下载中", "statusDownloading"),
-            "success": ("✅ 已完成", "statusSuccess"),
-            "error": ("❌ 失败", "statusError")
-        }
-
-        text, style_class = status_map.get(status, ("❓ 未知", "statusPending"))
-        self.status_label.setText(text)
-        self.status_label.setObjectName(style_class)
-        self.status_label.style().unpolish(self.status_label)
-        self.status_label.style().polish(self.status_label)
-
-        # 显示或隐藏进度条（检查是否存在）
-        if hasattr(self, 'progress_bar'):
-            if status == "downloading":
-                self.progress_bar.setVisible(True)
-            else:
-                self.progress_bar.setVisible(False)
-
-    def update_progress(self, progress: int):
-        """更新进度"""
-        self.progress_bar.setValue(progress)
-
-    def update_thumbnail(self, thumbnail_path: str):
-        """更新缩略图"""
-        if thumbnail_path and os.path.exists(thumbnail_path):
-            try:
-                pixmap = QPixmap(thumbnail_path)
-                if not pixmap.isNull():
-                    self.thumbnail_label.setPixmap(pixmap)
-                    print(f"✅ 缩略图已更新: {thumbnail_path}")
-            except Exception as e:
-                print(f"⚠️ 加载缩略图失败: {e}")
-
-    def update_file_size(self, size_bytes: int):
-        """更新文件大小"""
-        if size_bytes > 0:
-            # 格式化文件大小
-            size_str = self._format_size(size_bytes)
-            self.size_label.setText(size_str)
-            print(f"✅ 文件大小已更新: {size_str}")
-
-    def update_duration(self, duration_str: str):
-        """更新视频时长"""
-        if duration_str:
-            self.duration_label.setText(duration_str)
-            print(f"✅ 视频时长已更新: {duration_str}")
+        row = self._rows.get(video_id)
+        if row is None:
+            return False
+        self._items[row].update(fields)
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def update_many(self, changes: Dict[str, Dict[str, Any]]):
+        """批量更新多个任务，只发出一次 dataChanged"""
+        rows = []
+        for video_id, fields in changes.items():
+            row = self._rows.get(video_id)
+            if row is not None:
+                self._items[row].update(fields)
+                rows.append(row)
+        if rows:
+            self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)))
+
+    def remove_video(self, video_id: str) -> bool:
+        """删除任务"""
+        row = self._rows.pop(video_id, None)
+        if row is None:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._items[row]
+        for i in range(row, len(self._items)):
+            self._rows[self._items[i].get("id", "")] = i
+        self.endRemoveRows()
+        return True
+
+    def clear(self):
+        """清空任务"""
+        self.beginResetModel()
+        self._items.clear()
+        self._rows.clear()
+        self.endResetModel()
+
+    def items(self) -> List[Dict[str, Any]]:
+        """全部任务数据（按添加顺序）"""
+        return list(self._items)
+
+
+class VideoItemDelegate(QStyledItemDelegate):
+    """绘制任务卡片并处理卡片上的操作按钮"""
+
+    # 信号
+    action_triggered = pyqtSignal(str, str)  # action, video_id
+
+    ITEM_HEIGHT = 90
+    CARD_MARGIN = (12, 3)  # 卡片外边距（水平, 垂直）
+    PADDING = 8
+    THUMBNAIL_SIZE = THUMBNAIL_SIZE
+    BUTTON_SIZE = 28
+    BUTTON_SPACING = 4
+    PROGRESS_WIDTH = 300
+
+    # 操作按钮：(动作, 图标, 提示)
+    ACTIONS = (
+        ("refresh", "🔄", "刷新"),
+        ("open_folder", "📁", "打开文件夹"),
+        ("delete", "🗑️", "删除任务"),
+    )
+
+    STATUS_MAP = {
+        "resolving": ("🔍 解析中", "statusPending"),
+        "pending": ("⏳ 等待中", "statusPending"),
+        "downloading": ("⬇️ 下载中", "statusDownloading"),
+        "success": ("✅ 已完成", "statusSuccess"),
+        "error": ("❌ 失败", "statusError")
+    }
 
-    def _format_size(self, size_bytes: int) -> str:
-        """格式化文件大小"""
-        if size_bytes == 0:
-            return "未知"
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.title_font = QFont()
+        self.title_font.setPixelSize(14)
+        self.title_font.setWeight(QFont.DemiBold)
+        self.info_font = QFont()
+        self.info_font.setPixelSize(12)
+        self.status_font = QFont()
+        self.status_font.setPixelSize(11)
+        self.progress_font = QFont()
+        self.progress_font.setPixelSize(10)
+        self.icon_font = QFont()
+        self.icon_font.setPixelSize(28)
+        self.button_font = QFont()
+        self.button_font.setPixelSize(13)
+        # 缩略图在后台解码，绘制时只取内存中的图片
+        self.thumbnail_cache = ThumbnailCache(self)
+
+    def sizeHint(self, option, index) -> QSize:
+        return QSize(option.rect.width(), self.ITEM_HEIGHT)
+
+    def _card_rect(self, rect: QRect) -> QRect:
+        """卡片区域"""
+        dx, dy = self.CARD_MARGIN
+        return rect.adjusted(dx, dy, -dx, -dy)
+
+    def _button_rects(self, card: QRect) -> List[tuple]:
+        """操作按钮区域，横向排列在卡片右侧"""
+        size = self.BUTTON_SIZE
+        top = card.center().y() - size // 2
+        right = card.right() - self.PADDING
+        rects = []
+        for action, icon, tooltip in reversed(self.ACTIONS):
+            rects.append((action, icon, tooltip, QRect(right - size + 1, top, size, size)))
+            right -= size + self.BUTTON_SPACING
+        rects.reverse()
+        return rects
+
+    def _thumbnail(self, data: Dict[str, Any]) -> Optional[QPixmap]:
+        """取缩略图（未加载时返回 None，加载完成后视图重绘）"""
+        return self.thumbnail_cache.get(data.get("aweme_id"), data.get("thumbnail"))
+
+    def forget_thumbnail(self, path: str):
+        """缩略图文件更新后清除缓存"""
+        self.thumbnail_cache.forget(path)
+
+    def _progress_text(self, data: Dict[str, Any]) -> str:
+        """进度条文字：百分比、速度和剩余时间"""
+        text = f"{data.get('progress', 0)}%"
+        if data.get("speed"):
+            text += f" · {format_size(data['speed'])}/s"
+        if data.get("eta") is not None:
+            minutes, secs = divmod(int(data["eta"]), 60)
+            text += f" · 剩余 {minutes}:{secs:02d}"
+        return text
+
+    def paint(self, painter: QPainter, option, index: QModelIndex):
+        data = index.data(VideoListModel.VideoDataRole)
+        if not data:
+            return
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+
+        # 卡片背景
+        card = self._card_rect(option.rect)
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        painter.setPen(QPen(QColor(VIDEO_ITEM_COLORS["border_hover" if hovered else "border"]), 1))
+        painter.setBrush(QColor(VIDEO_ITEM_COLORS["card"]))
+        painter.drawRoundedRect(card, 8, 8)
+
+        # 左侧：缩略图
+        thumb = QRect(card.left() + self.PADDING, card.top() + (card.height() - self.THUMBNAIL_SIZE.height()) // 2,
+                      self.THUMBNAIL_SIZE.width(), self.THUMBNAIL_SIZE.height())
+        pixmap = self._thumbnail(data)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(VIDEO_ITEM_COLORS["thumbnail"]))
+        painter.drawRoundedRect(thumb, 6, 6)
+        if pixmap:
+            painter.drawPixmap(thumb, pixmap)
+        else:
+            painter.setFont(self.icon_font)
+            painter.setPen(QColor(VIDEO_ITEM_COLORS["info"]))
+            painter.drawText(thumb, Qt.AlignCenter, "🎬")
 
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
+        # 右侧：操作按钮
+        buttons = self._button_rects(card)
+        hover_pos = None
+        if hovered and isinstance(option.widget, QAbstractItemView):
+            hover_pos = option.widget.viewport().mapFromGlobal(QCursor.pos())
+        painter.setFont(self.button_font)
+        for action, icon, tooltip, rect in buttons:
+            button_hovered = hover_pos is not None and rect.contains(hover_pos)
+            painter.setPen(QPen(QColor(VIDEO_ITEM_COLORS["border_hover" if button_hovered else "border"]), 1))
+            painter.setBrush(QColor(VIDEO_ITEM_COLORS["button_hover"]) if button_hovered else Qt.NoBrush)
+            painter.drawRoundedRect(rect, 6, 6)
+            painter.setPen(QColor(VIDEO_ITEM_COLORS["title"]))
+            painter.drawText(rect, Qt.AlignCenter, icon)
+
+        # 中间：标题、信息行、状态和进度
+        left = thumb.right() + 11
+        right = buttons[0][3].left() - 10
+        width = max(0, right - left)
+        top = card.top() + self.PADDING
+
+        painter.setFont(self.title_font)
+        painter.setPen(QColor(VIDEO_ITEM_COLORS["title"]))
+        title_metrics = QFontMetrics(self.title_font)
+        title = title_metrics.elidedText(data.get("title", "未知标题"), Qt.ElideRight, width)
+        painter.drawText(QRect(left, top, width, title_metrics.height()), Qt.AlignLeft | Qt.AlignVCenter, title)
+        top += title_metrics.height() + 4
+
+        painter.setFont(self.info_font)
+        painter.setPen(QColor(VIDEO_ITEM_COLORS["info"]))
+        info_metrics = QFontMetrics(self.info_font)
+        info = "   ".join([
+            f"📄 {data.get('format', 'MP4')}",
+            f"💾 {data.get('size', '未知')}",
+            f"📺 {data.get('resolution', '未知')}",
+            f"⏱️ {data.get('duration', '未知')}"
+        ])
+        info = info_metrics.elidedText(info, Qt.ElideRight, width)
+        painter.drawText(QRect(left, top, width, info_metrics.height()), Qt.AlignLeft | Qt.AlignVCenter, info)
+        top += info_metrics.height() + 6
 
-        return f"{size_bytes:.1f} TB"
+        # 状态标签
+        status = data.get("status", "pending")
+        text, style_class = self.STATUS_MAP.get(status, ("❓ 未知", "statusPending"))
+        background, foreground = STATUS_COLORS[style_class]
+        status_metrics = QFontMetrics(self.status_font)
+        status_rect = QRect(left, top, max(80, status_metrics.horizontalAdvance(text) + 16), status_metrics.height() + 6)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(background))
+        painter.drawRoundedRect(status_rect, 3, 3)
+        painter.setFont(self.status_font)
+        painter.setPen(QColor(foreground))
+        painter.drawText(status_rect, Qt.AlignCenter, text)
+
+        # 进度条（仅下载中显示）
+        if status == "downloading":
+            bar_left = status_rect.right() + 11
+            bar_width = min(self.PROGRESS_WIDTH, right - bar_left)
+            if bar_width > 40:
+                bar = QRect(bar_left, status_rect.top() + 1, bar_width, status_rect.height() - 2)
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(QColor(VIDEO_ITEM_COLORS["progress_bg"]))
+                painter.drawRoundedRect(bar, 3, 3)
+                progress = max(0, min(100, int(data.get("progress", 0))))
+                if progress > 0:
+                    painter.setBrush(QColor(VIDEO_ITEM_COLORS["progress"]))
+                    painter.drawRoundedRect(QRect(bar.left(), bar.top(), bar.width() * progress // 100, bar.height()), 3, 3)
+                painter.setFont(self.progress_font)
+                painter.setPen(QColor(VIDEO_ITEM_COLORS["title"]))
+                painter.drawText(bar, Qt.AlignCenter, self._progress_text(data))
+
+        painter.restore()
+
+    def _button_at(self, option, pos) -> Optional[tuple]:
+        """返回鼠标位置下的操作按钮"""
+        for button in self._button_rects(self._card_rect(option.rect)):
+            if button[3].contains(pos):
+                return button
+        return None
+
+    def editorEvent(self, event, model, option, index) -> bool:
+        """处理卡片上操作按钮的点击"""
+        view = self.parent()
+        if event.type() == QEvent.MouseMove:
+            button = self._button_at(option, event.pos())
+            if isinstance(view, QAbstractItemView):
+                view.viewport().setCursor(Qt.PointingHandCursor if button else Qt.ArrowCursor)
+                view.viewport().setToolTip(button[2] if button else "")
+                view.viewport().update(option.rect)
+        elif event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            button = self._button_at(option, event.pos())
+            if button:
+                data = index.data(VideoListModel.VideoDataRole) or {}
+                self.action_triggered.emit(button[0], data.get("id", ""))
+                return True
+        return super().editorEvent(event, model, option, index)
 
 
 class EmptyState(QWidget):
@@ -285,7 +385,6 @@ class VideoList(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.video_cards: Dict[str, VideoCard] = {}
         self.init_ui()
 
     def init_ui(self):
@@ -294,100 +393,121 @@ class VideoList(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
 
-        # 滚动区域
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        scroll_area.setStyleSheet(VIDEO_LIST_STYLE)
-
-        # 内容容器
-        self.content_widget = QWidget()
-        self.content_widget.setObjectName("contentWidget")
-        self.content_layout = QVBoxLayout(self.content_widget)
-        self.content_layout.setContentsMargins(0, 10, 0, 10)
-        self.content_layout.setSpacing(0)
-        self.content_layout.setAlignment(Qt.AlignTop)
+        # 任务列表（只绘制可见行）
+        self.model = VideoListModel(self)
+        self.list_view = QListView()
+        self.list_view.setObjectName("videoListView")
+        self.list_view.setStyleSheet(VIDEO_LIST_STYLE)
+        self.delegate = VideoItemDelegate(self.list_view)
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(self.delegate)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setMouseTracking(True)
+        self.list_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.list_view.setFocusPolicy(Qt.NoFocus)
+        self.list_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.list_view.verticalScrollBar().setSingleStep(20)
+        self.list_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.list_view.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.list_view.setVisible(False)
+        self.delegate.action_triggered.connect(self._on_action_triggered)
+        self.delegate.thumbnail_cache.thumbnail_ready.connect(lambda _: self.list_view.viewport().update())
 
         # 空状态
         self.empty_state = EmptyState()
-        self.content_layout.addWidget(self.empty_state)
 
-        scroll_area.setWidget(self.content_widget)
-        layout.addWidget(scroll_area)
+        layout.addWidget(self.empty_state)
+        layout.addWidget(self.list_view)
+
+    def _on_action_triggered(self, action: str, video_id: str):
+        """卡片按钮点击"""
+        signal = {
+            "refresh": self.refresh_clicked,
+            "open_folder": self.open_folder_clicked,
+            "delete": self.delete_clicked,
+            "download": self.download_clicked
+        }.get(action)
+        if signal and video_id:
+            signal.emit(video_id)
+
+    def _update_empty_state(self):
+        """没有任务时显示空状态"""
+        has_videos = self.model.rowCount() > 0
+        self.empty_state.setVisible(not has_videos)
+        self.list_view.setVisible(has_videos)
 
     def add_video(self, video_data: Dict[str, Any]):
         """添加视频"""
-        # 隐藏空状态
-        self.empty_state.setVisible(False)
-
-        # 创建视频卡片
-        video_card = VideoCard(video_data)
-        video_card.download_clicked.connect(self.download_clicked)
-        video_card.open_folder_clicked.connect(self.open_folder_clicked)
-        video_card.refresh_clicked.connect(self.refresh_clicked)
-        video_card.delete_clicked.connect(self.delete_clicked)
+        self.model.add_video(video_data)
+        self._update_empty_state()
 
-        # 添加到布局
-        self.content_layout.addWidget(video_card)
+    def get_video_data(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """获取任务数据"""
+        return self.model.get_video_data(video_id)
 
-        # 保存引用
-        video_id = video_data.get("id", "")
-        self.video_cards[video_id] = video_card
+    def get_all_video_data(self) -> List[Dict[str, Any]]:
+        """获取全部任务数据"""
+        return self.model.items()
 
     def update_video_status(self, video_id: str, status: str):
-        """更新视频状态"""
-        if video_id in self.video_cards:
-            self.video_cards[video_id].update_status(status)
+        """
+        更新视频状态
+        :param status: resolving, pending, downloading, success, error
+        """
+        self.model.update_video(video_id, {"status": status})
+
+    def update_video_info(self, video_id: str, video_data: Dict[str, Any]):
+        """解析完成后更新标题、格式和分辨率"""
+        fields = {key: video_data[key] for key in ("title", "format", "resolution", "aweme_id")
+                  if video_data.get(key)}
+        if fields:
+            self.model.update_video(video_id, fields)
 
     def update_video_progress(self, video_id: str, progress: int):
         """更新视频进度"""
-        if video_id in self.video_cards:
-            self.video_cards[video_id].update_progress(progress)
+        self.model.update_video(video_id, {"progress": progress})
+
+    def update_progress_batch(self, changes: Dict[str, Dict[str, Any]]):
+        """
+        批量更新进度，所有任务更新完后统一重绘一次
+        :param changes: {video_id: {"progress", "speed", "eta", ...}}
+        """
+        self.model.update_many({
+            video_id: {
+                "progress": change["progress"],
+                "speed": change.get("speed", 0),
+                "eta": change.get("eta")
+            }
+            for video_id, change in changes.items()
+        })
 
     def update_video_thumbnail(self, video_id: str, thumbnail_path: str):
         """更新视频缩略图"""
-        if video_id in self.video_cards:
-            self.video_cards[video_id].update_thumbnail(thumbnail_path)
+        if thumbnail_path and os.path.exists(thumbnail_path):
+            self.delegate.forget_thumbnail(thumbnail_path)
+            self.model.update_video(video_id, {"thumbnail": thumbnail_path})
 
     def update_video_file_size(self, video_id: str, size_bytes: int):
         """更新视频文件大小"""
-        if video_id in self.video_cards:
-            self.video_cards[video_id].update_file_size(size_bytes)
+        if size_bytes > 0:
+            self.model.update_video(video_id, {"size": format_size(size_bytes)})
 
     def update_video_duration(self, video_id: str, duration_str: str):
         """更新视频时长"""
-        if video_id in self.video_cards:
-            self.video_cards[video_id].update_duration(duration_str)
+        if duration_str:
+            self.model.update_video(video_id, {"duration": duration_str})
 
     def remove_video(self, video_id: str):
-        """删除视频卡片"""
-        if video_id in self.video_cards:
-            video_card = self.video_cards[video_id]
-            # 从布局中移除
-            self.content_layout.removeWidget(video_card)
-            # 删除控件
-            video_card.deleteLater()
-            # 从字典中删除
-            del self.video_cards[video_id]
-            print(f"✅ 已删除视频卡片: {video_id}")
-
-            # 如果没有视频了，显示空状态
-            if len(self.video_cards) == 0:
-                self.empty_state.setVisible(True)
+        """删除视频"""
+        if self.model.remove_video(video_id):
+            print(f"✅ 已删除视频任务: {video_id}")
+            self._update_empty_state()
 
     def clear_videos(self):
         """清空视频列表"""
-        # 移除所有视频卡片
-        for video_card in self.video_cards.values():
-            self.content_layout.removeWidget(video_card)
-            video_card.deleteLater()
-
-        self.video_cards.clear()
-
-        # 显示空状态
-        self.empty_state.setVisible(True)
+        self.model.clear()
+        self._update_empty_state()
 
     def get_video_count(self) -> int:
         """获取视频数量"""
-        return len(self.video_cards)
+        return self.model.rowCount()